@@ -0,0 +1,19 @@
+"""
+Root URLconf for requests under /admin/.
+
+AdminURLConfMiddleware selects it per request, so the admin site and every
+app's admin.py are imported by the first admin request rather than on
+startup. config.urls, which serves everything else, leaves the admin out.
+"""
+
+from django.contrib import admin
+from django.urls import path
+
+from .urls import urlpatterns as site_urlpatterns
+
+admin.autodiscover()
+
+urlpatterns = [
+    path('admin/', admin.site.urls),
+    *site_urlpatterns,
+]
@@ -0,0 +1,23 @@
+from django.contrib import admin
+from django.contrib.admin.apps import SimpleAdminConfig
+from django.contrib.admin.checks import check_admin_app, check_dependencies
+from django.core import checks
+
+
+def check_discovered_admin_app(app_configs, **kwargs):
+    admin.autodiscover()
+    return check_admin_app(app_configs, **kwargs)
+
+
+class LazyAdminConfig(SimpleAdminConfig):
+    """
+    The admin, without importing every app's admin.py at startup.
+
+    The ModelAdmins are discovered when config.admin_urls is first loaded,
+    i.e. by the first request under /admin/ (see AdminURLConfMiddleware),
+    or by the system checks.
+    """
+
+    def ready(self):
+        checks.register(check_dependencies, checks.Tags.admin)
+        checks.register(check_discovered_admin_app, checks.Tags.admin)
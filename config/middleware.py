@@ -0,0 +1,10 @@
+class AdminURLConfMiddleware:
+    """Resolve /admin/ requests against config.admin_urls (see config/apps.py)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path_info == '/admin' or request.path_info.startswith('/admin/'):
+            request.urlconf = 'config.admin_urls'
+        return self.get_response(request)
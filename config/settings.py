@@ -30,7 +30,8 @@ if os.environ.get('VERCEL_ENV') or os.environ.get('DATABASE_URL'):
     ])
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    # The admin without autodiscovery at startup; see config/apps.py
+    'config.apps.LazyAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -41,12 +42,19 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # WhiteNoise, reading the file list written by collectstatic instead of
+    # scanning STATIC_ROOT on every cold start (skillswap/staticfiles.py)
+    'skillswap.staticfiles.StaticFilesMiddleware',
+    # Before the session middleware, so session writes pin to the primary too
+    'skillswap.middleware.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'config.middleware.AdminURLConfMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'skillswap.middleware.ProfileMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'skillswap.middleware.MetricsMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -54,7 +62,8 @@ ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # The Django backend, with render time recorded for skillswap.metrics
+        'BACKEND': 'skillswap.metrics.InstrumentedDjangoTemplates',
         'DIRS': [BASE_DIR / 'skillswap' / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -63,6 +72,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'skillswap.context_processors.unread_messages_count',
             ],
         },
     },
@@ -83,6 +93,104 @@ else:
         }
     }
 
+# Read replica: reads made while serving safe requests go to
+# DATABASE_REPLICA_URL (skillswap.replicas). A browser whose request wrote
+# reads from the primary for REPLICA_STICKY_SECONDS afterwards. Try it locally
+# with a second SQLite file kept in sync by `manage.py sync_replica`.
+DATABASE_REPLICA_URL = config('DATABASE_REPLICA_URL', default='')
+if DATABASE_REPLICA_URL:
+    DATABASES['replica'] = dj_database_url.parse(DATABASE_REPLICA_URL, conn_max_age=600)
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+    DATABASE_ROUTERS = ['skillswap.replicas.PrimaryReplicaRouter']
+
+SKILLSWAP_REPLICAS = {
+    'ALIASES': [alias for alias in DATABASES if alias != 'default'],
+    'STICKY_SECONDS': config('REPLICA_STICKY_SECONDS', default=10, cast=int),
+}
+
+# Cache: per-process memory by default; point CACHE_URL at a shared backend
+# (e.g. redis://host:6379/0) when running several workers
+CACHE_URL = config('CACHE_URL', default='')
+if CACHE_URL.startswith(('redis://', 'rediss://')):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'skillswap',
+        }
+    }
+
+# Live chat pub/sub: in-process by default, Redis when several workers serve
+# the SSE streams (CHAT_BROKER_URL=redis://host:6379/1)
+CHAT_BROKER_URL = config('CHAT_BROKER_URL', default='')
+if CHAT_BROKER_URL:
+    SKILLSWAP_CHAT_BROKER = {
+        'BACKEND': 'skillswap.broker.RedisBroker',
+        'LOCATION': CHAT_BROKER_URL,
+    }
+else:
+    SKILLSWAP_CHAT_BROKER = {
+        'BACKEND': 'skillswap.broker.InMemoryBroker',
+    }
+
+# Server-sent events reach only the subscribers of the process that published,
+# so on a multi-instance deployment (Vercel) without a shared broker the chat
+# page polls instead of streaming
+SKILLSWAP_CHAT_STREAMING = config(
+    'CHAT_STREAMING', default=bool(CHAT_BROKER_URL) or not os.environ.get('VERCEL_ENV'), cast=bool
+)
+
+# Database-backed task queue (skillswap.tasks). Tasks run in-process after the
+# enqueuing transaction commits unless TASKS_EAGER=False, which queues them for
+# `manage.py run_worker`; neither runserver nor Vercel starts a worker, so the
+# queue is only for deployments that run one as a separate process.
+SKILLSWAP_TASKS = {
+    'EAGER': config('TASKS_EAGER', default=True, cast=bool),
+    'MAX_ATTEMPTS': 5,
+    'LEASE_SECONDS': 300,
+}
+
+# Per-view request metrics served at /metrics/ to staff users, or to scrapers
+# sending "Authorization: Bearer $METRICS_TOKEN". Requests slower than
+# SLOW_REQUEST_MS are logged to the skillswap.metrics logger with their SQL.
+SKILLSWAP_METRICS = {
+    'ENABLED': config('METRICS_ENABLED', default=True, cast=bool),
+    'SLOW_REQUEST_MS': config('SLOW_REQUEST_MS', default=1000, cast=int),
+    'TOKEN': config('METRICS_TOKEN', default=''),
+}
+
+# Message archive (skillswap.archive): `manage.py archive_messages` moves read
+# messages older than this many days out of the hot Message table
+SKILLSWAP_ARCHIVE = {
+    'MESSAGE_AGE_DAYS': config('ARCHIVE_MESSAGES_AFTER_DAYS', default=90, cast=int),
+    'BATCH_SIZE': 1000,
+}
+
+# Token-bucket rate limits on login, registration and chat sends
+# (skillswap.ratelimit); limits per URL name default to those in that module.
+# Behind a proxy, RATELIMIT_IP_HEADER names the header with the client IP;
+# Vercel's edge sets X-Forwarded-For, so it is the default there. Buckets live
+# in the cache: set CACHE_URL so every instance shares them.
+SKILLSWAP_RATELIMIT = {
+    'ENABLED': config('RATELIMIT_ENABLED', default=True, cast=bool),
+    'IP_HEADER': config(
+        'RATELIMIT_IP_HEADER', default='X-Forwarded-For' if os.environ.get('VERCEL_ENV') else ''
+    ),
+}
+
+# ProfileBackend loads the session's user together with its profile
+# (request.profile). ModelBackend still loads sessions created before it.
+AUTHENTICATION_BACKENDS = [
+    'skillswap.backends.ProfileBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -106,7 +214,7 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [BASE_DIR / 'skillswap' / 'static']
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'
+STATICFILES_STORAGE = 'skillswap.staticfiles.StaticFilesStorage'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
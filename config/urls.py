@@ -1,10 +1,9 @@
-from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
+    # /admin/ is routed through config.admin_urls by AdminURLConfMiddleware
     path('', include('skillswap.urls')),
 ]
 
@@ -20,5 +20,10 @@ echo "  Admin: http://127.0.0.1:8000/admin/"
 echo ""
 echo "Press Ctrl+C to stop the server"
 echo ""
+if [ "$TASKS_EAGER" = "False" ]; then
+    echo "TASKS_EAGER=False: also run 'python manage.py run_worker' in another"
+    echo "terminal, or background tasks (image resizing) never run."
+    echo ""
+fi
 
 python manage.py runserver
@@ -1,6 +1,50 @@
+from functools import partial
+
 from django.contrib import admin
+from django.db.models import OuterRef, Q
 from django.utils.html import format_html
-from .models import UserProfile, Skill, SkillExchange, Review, Message
+from .counters import aggregate_subquery
+from . import bulk, exports, tasks
+from .models import UserProfile, Skill, SkillExchange, ExchangeEvent, Review, Message, ArchivedMessage, Task, DeadTask
+
+# ============================================================================
+# EXPORT ACTIONS
+# ============================================================================
+
+class ExportActionsMixin:
+    """
+    Stream the selected rows as CSV or JSON Lines.
+
+    Use "Select all" in the changelist to export everything that matches
+    the current filters and search.
+    """
+    actions = ['export_csv', 'export_jsonl']
+
+    @admin.action(description='Export selected %(verbose_name_plural)s as CSV')
+    def export_csv(self, request, queryset):
+        return exports.streaming_response(queryset, 'csv')
+
+    @admin.action(description='Export selected %(verbose_name_plural)s as JSON Lines')
+    def export_jsonl(self, request, queryset):
+        return exports.streaming_response(queryset, 'jsonl')
+
+# ============================================================================
+# BULK ACTIONS
+# ============================================================================
+
+def run_bulk_action(model_admin, request, queryset, change, past_tense, noun):
+    """
+    Run a ``skillswap.bulk`` change over the selection and report how much
+    of it changed and in how many batches.
+    """
+    batches = []
+    done = change(queryset, progress=lambda done, total: batches.append((done, total)))
+    total = batches[-1][1] if batches else 0
+    model_admin.message_user(
+        request,
+        f'{past_tense} {done} of {total} {noun} in {len(batches)} '
+        f'batch{"es" if len(batches) != 1 else ""} of up to {bulk.BATCH_SIZE}.',
+    )
 
 # ============================================================================
 # USER PROFILE ADMIN
@@ -32,6 +76,21 @@ class UserProfileAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         })
     )
+    actions = ['delete_sent_messages']
+
+    @admin.action(description='Delete all messages sent by selected users', permissions=['delete'])
+    def delete_sent_messages(self, request, queryset):
+        messages = Message.objects.filter(sender__in=queryset.values('pk'))
+        run_bulk_action(self, request, messages, bulk.delete_messages, 'Deleted', 'messages')
+    
+    def get_queryset(self, request):
+        # Correlated COUNT subqueries rather than Count() over two joins, which
+        # would multiply the rows and need DISTINCT on every page
+        participant = Q(requester=OuterRef('pk')) | Q(provider=OuterRef('pk'))
+        return super().get_queryset(request).select_related('user').annotate(
+            skills_total=aggregate_subquery(Skill.objects.filter(owner=OuterRef('pk')), 'COUNT'),
+            exchanges_total=aggregate_subquery(SkillExchange.objects.filter(participant), 'COUNT'),
+        )
     
     def username_display(self, obj):
         return format_html('<strong>{}</strong>', obj.user.username)
@@ -45,21 +104,21 @@ class UserProfileAdmin(admin.ModelAdmin):
         if obj.rating:
             color = 'green' if obj.rating >= 4 else 'orange' if obj.rating >= 3 else 'red'
             return format_html(
-                '<span style="color: {}; font-weight: bold;">{:.1f}★</span>',
-                color, obj.rating
+                '<span style="color: {}; font-weight: bold;">{}★</span>',
+                color, f'{obj.rating:.1f}'
             )
         return format_html('<span style="color: gray;">No rating</span>')
     rating_display.short_description = 'Rating'
     
     def skills_count(self, obj):
-        count = obj.skills.count()
-        return format_html('<span style="background-color: #e7f3ff; padding: 3px 8px; border-radius: 3px;">{}</span>', count)
+        return format_html('<span style="background-color: #e7f3ff; padding: 3px 8px; border-radius: 3px;">{}</span>', obj.skills_total)
     skills_count.short_description = 'Skills'
+    skills_count.admin_order_field = 'skills_total'
     
     def exchanges_count(self, obj):
-        count = obj.skillexchange_set.all().count()
-        return format_html('<span style="background-color: #fff3e0; padding: 3px 8px; border-radius: 3px;">{}</span>', count)
+        return format_html('<span style="background-color: #fff3e0; padding: 3px 8px; border-radius: 3px;">{}</span>', obj.exchanges_total)
     exchanges_count.short_description = 'Exchanges'
+    exchanges_count.admin_order_field = 'exchanges_total'
     
     def user_info(self, obj):
         return format_html(
@@ -69,20 +128,17 @@ class UserProfileAdmin(admin.ModelAdmin):
     user_info.short_description = 'User Information'
     
     def statistics(self, obj):
-        completed = SkillExchange.objects.filter(status='completed').filter(
-            skillexchange_id__in=[obj.skillexchange_set.all()]
-        ).count()
-        pending = obj.skillexchange_set.filter(status='pending').count()
-        accepted = obj.skillexchange_set.filter(status='accepted').count()
-        
+        if obj.pk is None:
+            return '-'
         return format_html(
             '<div style="background-color: #f5f5f5; padding: 10px; border-radius: 5px;">'
             '<strong>Pending:</strong> {}<br>'
             '<strong>Accepted:</strong> {}<br>'
+            '<strong>Completed:</strong> {}<br>'
             '<strong>Messages Sent:</strong> {}<br>'
             '<strong>Messages Received:</strong> {}'
             '</div>',
-            pending, accepted,
+            obj.exchanges_pending, obj.exchanges_accepted, obj.exchanges_completed,
             obj.messages_sent.count(), obj.messages_received.count()
         )
     statistics.short_description = 'Statistics'
@@ -112,6 +168,9 @@ class SkillAdmin(admin.ModelAdmin):
         })
     )
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('owner__user')
+    
     def name_display(self, obj):
         return format_html('<strong>{}</strong>', obj.name)
     name_display.short_description = 'Skill Name'
@@ -163,12 +222,26 @@ class SkillAdmin(admin.ModelAdmin):
 # SKILL EXCHANGE ADMIN
 # ============================================================================
 
+class ExchangeEventInline(admin.TabularInline):
+    model = ExchangeEvent
+    fields = ('from_status', 'to_status', 'actor', 'created_at')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(SkillExchange)
-class SkillExchangeAdmin(admin.ModelAdmin):
+class SkillExchangeAdmin(ExportActionsMixin, admin.ModelAdmin):
     list_display = ('exchange_id_display', 'requester_display', 'provider_display', 'skills_display', 'status_display', 'created_at', 'days_ago')
     list_filter = ('status', 'created_at')
     search_fields = ('requester__user__username', 'provider__user__username', 'skill_offered__name', 'skill_requested__name')
-    readonly_fields = ('created_at', 'exchange_details', 'messages_count')
+    # Status only changes through the actions below, which go through
+    # SkillExchange.TRANSITIONS and record an ExchangeEvent
+    readonly_fields = ('status', 'created_at', 'exchange_details', 'messages_count')
+    inlines = [ExchangeEventInline]
     
     fieldsets = (
         ('Exchange Details', {
@@ -184,6 +257,25 @@ class SkillExchangeAdmin(admin.ModelAdmin):
         })
     )
     
+    actions = ExportActionsMixin.actions + ['cancel_exchanges', 'reject_exchanges']
+
+    @admin.action(description='Cancel selected pending exchanges', permissions=['change'])
+    def cancel_exchanges(self, request, queryset):
+        run_bulk_action(self, request, queryset, partial(
+            bulk.set_exchange_status, status='cancelled', actor=request.profile,
+        ), 'Cancelled', 'pending exchanges')
+
+    @admin.action(description='Reject selected pending exchanges', permissions=['change'])
+    def reject_exchanges(self, request, queryset):
+        run_bulk_action(self, request, queryset, partial(
+            bulk.set_exchange_status, status='rejected', actor=request.profile,
+        ), 'Rejected', 'pending exchanges')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            'requester__user', 'provider__user', 'skill_offered', 'skill_requested'
+        )
+    
     def exchange_id_display(self, obj):
         return format_html('<strong>#{}</strong>', obj.id)
     exchange_id_display.short_description = 'ID'
@@ -258,7 +350,7 @@ class SkillExchangeAdmin(admin.ModelAdmin):
 # ============================================================================
 
 @admin.register(Message)
-class MessageAdmin(admin.ModelAdmin):
+class MessageAdmin(ExportActionsMixin, admin.ModelAdmin):
     list_display = ('sender_display', 'receiver_display', 'content_display', 'read_status', 'created_at', 'days_ago')
     list_filter = ('is_read', 'created_at')
     search_fields = ('sender__user__username', 'receiver__user__username', 'content')
@@ -281,6 +373,19 @@ class MessageAdmin(admin.ModelAdmin):
         })
     )
     
+    actions = ExportActionsMixin.actions + ['mark_read', 'delete_messages']
+
+    @admin.action(description='Mark selected messages as read', permissions=['change'])
+    def mark_read(self, request, queryset):
+        run_bulk_action(self, request, queryset, bulk.mark_messages_read, 'Marked read', 'unread messages')
+
+    @admin.action(description='Delete selected messages in bulk, without confirmation', permissions=['delete'])
+    def delete_messages(self, request, queryset):
+        run_bulk_action(self, request, queryset, bulk.delete_messages, 'Deleted', 'messages')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('sender__user', 'receiver__user')
+    
     def sender_display(self, obj):
         return format_html('<a href="/admin/skillswap/userprofile/{}/change/">{}</a>', 
                           obj.sender.id, obj.sender.user.username)
@@ -331,12 +436,47 @@ class MessageAdmin(admin.ModelAdmin):
         )
     message_details.short_description = 'Message Details'
 
+# ============================================================================
+# ARCHIVED MESSAGE ADMIN
+# ============================================================================
+
+@admin.register(ArchivedMessage)
+class ArchivedMessageAdmin(ExportActionsMixin, admin.ModelAdmin):
+    """Read-only search over messages moved out of the hot table (skillswap.archive)"""
+    list_display = ('id', 'sender_display', 'receiver_display', 'content_display', 'created_at')
+    list_filter = ('created_at',)
+    search_fields = ('sender__user__username', 'receiver__user__username', 'content')
+    date_hierarchy = 'created_at'
+    # Counting a large archive for every page is slower than the search itself
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('sender__user', 'receiver__user')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def sender_display(self, obj):
+        return obj.sender.user.username
+    sender_display.short_description = 'From'
+
+    def receiver_display(self, obj):
+        return obj.receiver.user.username
+    receiver_display.short_description = 'To'
+
+    def content_display(self, obj):
+        return obj.content[:60] + '...' if len(obj.content) > 60 else obj.content
+    content_display.short_description = 'Message'
+
 # ============================================================================
 # REVIEW ADMIN
 # ============================================================================
 
 @admin.register(Review)
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(ExportActionsMixin, admin.ModelAdmin):
     list_display = ('reviewer_display', 'reviewee_display', 'rating_display', 'exchange_display', 'created_at', 'days_ago')
     list_filter = ('rating', 'created_at')
     search_fields = ('reviewer__user__username', 'reviewee__user__username', 'comment')
@@ -356,6 +496,9 @@ class ReviewAdmin(admin.ModelAdmin):
         })
     )
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('reviewer__user', 'reviewee__user')
+    
     def reviewer_display(self, obj):
         return format_html('<a href="/admin/skillswap/userprofile/{}/change/">{}</a>', 
                           obj.reviewer.id, obj.reviewer.user.username)
@@ -377,8 +520,10 @@ class ReviewAdmin(admin.ModelAdmin):
     rating_display.short_description = 'Rating'
     
     def exchange_display(self, obj):
+        if obj.exchange_id is None:
+            return '-'
         return format_html('<a href="/admin/skillswap/skillexchange/{}/change/">Exchange #{}</a>', 
-                          obj.exchange.id, obj.exchange.id)
+                          obj.exchange_id, obj.exchange_id)
     exchange_display.short_description = 'Exchange'
     
     def days_ago(self, obj):
@@ -408,3 +553,27 @@ class ReviewAdmin(admin.ModelAdmin):
         )
     review_details.short_description = 'Review Details'
 
+# ============================================================================
+# TASK QUEUE ADMIN
+# ============================================================================
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('name', 'attempts', 'max_attempts', 'run_at', 'locked_by', 'locked_until', 'created_at')
+    list_filter = ('name',)
+    search_fields = ('name', 'last_error')
+    readonly_fields = ('attempts', 'locked_by', 'locked_until', 'last_error', 'created_at')
+
+
+@admin.register(DeadTask)
+class DeadTaskAdmin(admin.ModelAdmin):
+    list_display = ('name', 'attempts', 'created_at', 'failed_at')
+    list_filter = ('name', 'failed_at')
+    search_fields = ('name', 'last_error')
+    readonly_fields = ('name', 'args', 'kwargs', 'attempts', 'last_error', 'created_at', 'failed_at')
+    actions = ['requeue']
+
+    @admin.action(description='Requeue selected tasks')
+    def requeue(self, request, queryset):
+        count = tasks.requeue(list(queryset))
+        self.message_user(request, f'{count} tasks requeued.')
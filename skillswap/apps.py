@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SkillswapConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'skillswap'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from . import ratelimit  # noqa: F401  (deployment checks)
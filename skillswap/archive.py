@@ -0,0 +1,69 @@
+"""
+Hot/cold storage of chat messages.
+
+``Message`` holds the hot window: everything unread, and read messages
+younger than ``SKILLSWAP_ARCHIVE['MESSAGE_AGE_DAYS']``. ``archive_messages``
+(behind ``manage.py archive_messages``) moves older read messages, a batch
+at a time, into ``ArchivedMessage``, which has the same columns and keeps
+each message's id, so the chat views page through both tables by id and
+merge them.
+
+Unread messages are never archived, so the unread counters and the mark-read
+paths only ever look at the hot table. Inbox summaries whose last message
+is archived keep their snippet and time and lose only the foreign key.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import bulk
+from .cache import invalidate_admin_stats
+from .models import ArchivedMessage, Conversation, Message
+
+DEFAULTS = {
+    # Read messages older than this are moved to the archive
+    'MESSAGE_AGE_DAYS': 90,
+    'BATCH_SIZE': 1000,
+}
+
+# Columns copied from Message to ArchivedMessage
+COLUMNS = [field.attname for field in ArchivedMessage._meta.concrete_fields]
+
+
+def get_setting(name):
+    return getattr(settings, 'SKILLSWAP_ARCHIVE', {}).get(name, DEFAULTS[name])
+
+
+def archivable(older_than=None):
+    """Hot messages due for the archive: read and older than ``older_than``"""
+    if older_than is None:
+        older_than = timedelta(days=get_setting('MESSAGE_AGE_DAYS'))
+    return Message.objects.filter(is_read=True, created_at__lt=timezone.now() - older_than)
+
+
+def archive_messages(queryset, batch_size=None, progress=None):
+    """
+    Move the read messages of ``queryset`` to the archive. Returns the
+    number moved.
+    """
+    def apply(batch):
+        rows = list(
+            Message.objects.select_for_update()
+            .filter(pk__in=batch, is_read=True)
+            .values(*COLUMNS)
+        )
+        if not rows:
+            return 0
+        pks = [row['id'] for row in rows]
+        ArchivedMessage.objects.bulk_create([ArchivedMessage(**row) for row in rows])
+        Conversation.objects.filter(last_message_id__in=pks).update(last_message=None)
+        # Raw delete as in skillswap.bulk: read messages need no counter changes
+        Message.objects.filter(pk__in=pks)._raw_delete(Message.objects.db)
+        invalidate_admin_stats()
+        return len(rows)
+
+    return bulk.run_batches(
+        'messages archived', queryset.filter(is_read=True), batch_size or get_setting('BATCH_SIZE'), progress, apply,
+    )
@@ -0,0 +1,28 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import PermissionDenied
+
+UserModel = get_user_model()
+
+
+class ProfileBackend(ModelBackend):
+    """
+    ``ModelBackend`` that loads a session's user with its profile joined, so
+    ``request.profile`` (skillswap.middleware.ProfileMiddleware) costs no
+    query of its own.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        user = super().authenticate(request, username=username, password=password, **kwargs)
+        if user is None and password is not None:
+            # Stop here: ModelBackend, kept after this backend for sessions
+            # created before it, would hash the same password again
+            raise PermissionDenied
+        return user
+
+    def get_user(self, user_id):
+        try:
+            user = UserModel._default_manager.select_related('userprofile').get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,166 @@
+"""
+Publish/subscribe brokers for live chat.
+
+A broker fans out JSON-serializable payloads published on a channel to every
+open subscription of that channel. ``InMemoryBroker`` works inside a single
+process (development, tests, single-node deployments); ``RedisBroker`` uses
+Redis pub/sub so several workers can share channels. The backend is selected
+with the ``SKILLSWAP_CHAT_BROKER`` setting, in the same shape as ``CACHES``.
+"""
+
+import json
+import queue
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    """Interface returned by ``subscribe``: block for payloads, then close"""
+
+    def get(self, timeout=None):
+        """Return the next payload, or None if nothing arrived within ``timeout``"""
+        raise NotImplementedError
+
+    @property
+    def closed(self):
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+
+class BaseBroker:
+
+    def __init__(self, location=None, **options):
+        self.location = location
+        self.options = options
+
+    def publish(self, channel, payload):
+        raise NotImplementedError
+
+    def subscribe(self, channel):
+        raise NotImplementedError
+
+
+class InMemorySubscription(Subscription):
+
+    def __init__(self, broker, channel, maxsize):
+        self._broker = broker
+        self._channel = channel
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._closed = False
+
+    def deliver(self, payload):
+        try:
+            self._queue.put_nowait(payload)
+        except queue.Full:
+            # A reader this far behind reconnects and backfills from the database
+            self.close()
+
+    def get(self, timeout=None):
+        if self._closed:
+            return None
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._broker.unsubscribe(self._channel, self)
+
+
+class InMemoryBroker(BaseBroker):
+    """Thread-safe broker local to the current process"""
+
+    def __init__(self, location=None, **options):
+        super().__init__(location, **options)
+        self.max_queue_size = options.get('MAX_QUEUE_SIZE', 100)
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def publish(self, channel, payload):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.deliver(payload)
+
+    def subscribe(self, channel):
+        subscription = InMemorySubscription(self, channel, self.max_queue_size)
+        with self._lock:
+            self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, channel, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[channel]
+
+
+class RedisSubscription(Subscription):
+
+    def __init__(self, pubsub):
+        self._pubsub = pubsub
+        self._closed = False
+
+    def get(self, timeout=None):
+        if self._closed:
+            return None
+        message = self._pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout or 0)
+        if message is None:
+            return None
+        return json.loads(message['data'])
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._pubsub.close()
+
+
+class RedisBroker(BaseBroker):
+    """Redis pub/sub broker shared by every worker (requires the redis package)"""
+
+    def __init__(self, location=None, **options):
+        super().__init__(location, **options)
+        import redis
+
+        self._client = redis.Redis.from_url(location)
+
+    def publish(self, channel, payload):
+        self._client.publish(channel, json.dumps(payload))
+
+    def subscribe(self, channel):
+        pubsub = self._client.pubsub()
+        pubsub.subscribe(channel)
+        return RedisSubscription(pubsub)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """The process-wide broker configured by ``SKILLSWAP_CHAT_BROKER``"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                config = dict(getattr(settings, 'SKILLSWAP_CHAT_BROKER', {}))
+                backend = import_string(config.pop('BACKEND', 'skillswap.broker.InMemoryBroker'))
+                _broker = backend(config.pop('LOCATION', None), **config.pop('OPTIONS', {}))
+    return _broker
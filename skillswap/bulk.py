@@ -0,0 +1,160 @@
+"""
+Set-based bulk changes for moderation.
+
+Saving or deleting rows one at a time runs the signal handlers for each of
+them: a read, a write and a handful of counter UPDATEs per row. These
+helpers change a whole queryset with one UPDATE or DELETE per batch of
+primary keys instead, reading only the columns they need as tuples, and
+apply what the signal handlers would have done - profile counters, inbox
+summaries, the admin statistics cache - as a few aggregated statements in
+the same transaction. Each batch commits on its own, so locks are held briefly and a
+failure part way through leaves every finished batch consistent.
+
+``progress``, when given, is called after each batch with the number of
+rows changed so far and the number selected.
+"""
+
+import logging
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import conversations, counters, exchanges
+from .cache import invalidate_admin_stats
+from .models import Conversation, ExchangeEvent, Message, SkillExchange
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+
+def _batches(queryset, batch_size):
+    """Primary keys of ``queryset`` in ascending batches, read a batch at a time"""
+    ids = queryset.order_by('pk').values_list('pk', flat=True)
+    last_id = None
+    while True:
+        page = ids if last_id is None else ids.filter(pk__gt=last_id)
+        batch = list(page[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1]
+
+
+def run_batches(name, queryset, batch_size, progress, apply):
+    """
+    Call ``apply(pks)`` in a transaction for each batch of ``queryset``'s
+    primary keys. Returns the total of what it reports changed.
+    """
+    total = queryset.count()
+    done = 0
+    for batch in _batches(queryset, batch_size):
+        with transaction.atomic():
+            done += apply(batch)
+        logger.info('%s: %d of %d', name, done, total)
+        if progress:
+            progress(done, total)
+    return done
+
+
+def _adjust_counters(deltas):
+    """Apply ``{profile id: {field: amount}}`` with one UPDATE per distinct set of amounts"""
+    groups = defaultdict(list)
+    for profile_id, fields in deltas.items():
+        key = tuple(sorted((field, amount) for field, amount in fields.items() if amount))
+        if key:
+            groups[key].append(profile_id)
+    for key, profile_ids in groups.items():
+        counters.adjust(profile_ids, **dict(key))
+
+
+def set_exchange_status(queryset, status, actor=None, batch_size=BATCH_SIZE, progress=None):
+    """
+    Move the exchanges of ``queryset`` whose status allows it (see
+    ``SkillExchange.TRANSITIONS``) to ``status``, recording an
+    ``ExchangeEvent`` for each. Returns the number moved.
+    """
+    from_statuses = exchanges.sources(status)
+
+    def apply(batch):
+        rows = list(
+            SkillExchange.objects.select_for_update()
+            .filter(pk__in=batch, status__in=from_statuses)
+            .values_list('pk', 'requester_id', 'provider_id', 'status')
+        )
+        if not rows:
+            return 0
+        SkillExchange.objects.filter(pk__in=[row[0] for row in rows]).update(
+            status=status, updated_at=timezone.now()
+        )
+        # bulk_create sends no signals: the counters are adjusted below
+        ExchangeEvent.objects.bulk_create([
+            ExchangeEvent(exchange_id=pk, from_status=old_status, to_status=status, actor=actor)
+            for pk, _, _, old_status in rows
+        ])
+        deltas = defaultdict(Counter)
+        for _, requester_id, provider_id, old_status in rows:
+            # Same bookkeeping as counters.exchange_status_changed
+            for profile_id in {requester_id, provider_id}:
+                if old_status in counters.EXCHANGE_COUNTER_FIELDS:
+                    deltas[profile_id][counters.EXCHANGE_COUNTER_FIELDS[old_status]] -= 1
+                if status in counters.EXCHANGE_COUNTER_FIELDS:
+                    deltas[profile_id][counters.EXCHANGE_COUNTER_FIELDS[status]] += 1
+        _adjust_counters(deltas)
+        invalidate_admin_stats()
+        return len(rows)
+
+    candidates = queryset.filter(status__in=from_statuses)
+    return run_batches(f'exchanges -> {status}', candidates, batch_size, progress, apply)
+
+
+def _unread_by_receiver(rows):
+    """``{receiver id: {'unread_messages': -n}}`` for the unread messages among ``rows``"""
+    unread = Counter(receiver_id for _, _, receiver_id, is_read in rows if not is_read)
+    return {receiver_id: {'unread_messages': -amount} for receiver_id, amount in unread.items()}
+
+
+def mark_messages_read(queryset, batch_size=BATCH_SIZE, progress=None):
+    """Mark the unread messages of ``queryset`` read. Returns the number marked."""
+    def apply(batch):
+        rows = list(
+            Message.objects.select_for_update()
+            .filter(pk__in=batch, is_read=False)
+            .values_list('pk', 'sender_id', 'receiver_id', 'is_read')
+        )
+        if not rows:
+            return 0
+        Message.objects.filter(pk__in=[row[0] for row in rows]).update(is_read=True)
+        deltas = _unread_by_receiver(rows)
+        _adjust_counters(deltas)
+        conversations.refresh_conversations({(sender_id, receiver_id) for _, sender_id, receiver_id, _ in rows})
+        invalidate_admin_stats()
+        return len(rows)
+
+    return run_batches('messages read', queryset.filter(is_read=False), batch_size, progress, apply)
+
+
+def delete_messages(queryset, batch_size=BATCH_SIZE, progress=None):
+    """Delete the messages of ``queryset``. Returns the number deleted."""
+    def apply(batch):
+        rows = list(
+            Message.objects.select_for_update()
+            .filter(pk__in=batch)
+            .values_list('pk', 'sender_id', 'receiver_id', 'is_read')
+        )
+        if not rows:
+            return 0
+        pks = [row[0] for row in rows]
+        # What on_delete=SET_NULL would do; the summaries are rebuilt below
+        Conversation.objects.filter(last_message_id__in=pks).update(last_message=None)
+        # Skips the deletion collector, which would load every row to send the
+        # delete signals whose work is done here for the whole batch
+        Message.objects.filter(pk__in=pks)._raw_delete(Message.objects.db)
+        deltas = _unread_by_receiver(rows)
+        _adjust_counters(deltas)
+        conversations.refresh_conversations({(sender_id, receiver_id) for _, sender_id, receiver_id, _ in rows})
+        invalidate_admin_stats()
+        return len(rows)
+
+    return run_batches('messages deleted', queryset, batch_size, progress, apply)
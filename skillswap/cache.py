@@ -0,0 +1,169 @@
+"""
+Cache helpers shared by views and signal handlers.
+
+Keys are namespaced under ``skillswap:`` so they can share a cache backend
+with other apps.
+
+Rendered fragments and anonymous pages are cached under versioned keys:
+every key embeds the current generation of the models it depends on, and
+the signal handlers bump a model's generation whenever one of its rows is
+saved or deleted. Stale entries are never looked up again and simply expire,
+so invalidation needs no key scanning and works the same on the local-memory
+backend and on a shared Redis cache.
+"""
+
+import hashlib
+import time
+from functools import wraps
+
+from django.contrib import messages
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+
+ADMIN_STATS_TIMEOUT = 60
+FRAGMENT_TIMEOUT = 60 * 60
+PAGE_TIMEOUT = 60 * 10
+
+ADMIN_STATS_KEY = 'skillswap:admin-stats'
+
+
+def get_admin_stats():
+    """
+    Platform totals for the admin dashboard.
+
+    One aggregate query per table, cached briefly. Signal handlers drop the
+    entry when rows are saved or deleted; the timeout bounds staleness from
+    queryset ``update()`` calls, which bypass signals.
+    """
+    from django.db.models import Count, Q
+
+    from .models import ArchivedMessage, Message, Review, Skill, SkillExchange, UserProfile
+
+    stats = cache.get(ADMIN_STATS_KEY)
+    if stats is None:
+        exchanges = SkillExchange.objects.aggregate(
+            total_exchanges=Count('id'),
+            pending_exchanges=Count('id', filter=Q(status='pending')),
+            completed_exchanges=Count('id', filter=Q(status='completed')),
+        )
+        messages = Message.objects.aggregate(
+            total_messages=Count('id'),
+            unread_messages=Count('id', filter=Q(is_read=False)),
+        )
+        stats = {
+            'total_users': UserProfile.objects.count(),
+            'total_skills': Skill.objects.count(),
+            'total_reviews': Review.objects.count(),
+            **exchanges,
+            **messages,
+        }
+        stats['total_messages'] += ArchivedMessage.objects.count()
+        cache.set(ADMIN_STATS_KEY, stats, ADMIN_STATS_TIMEOUT)
+    return stats
+
+
+def invalidate_admin_stats():
+    transaction.on_commit(lambda: cache.delete(ADMIN_STATS_KEY))
+
+
+def generation_key(model_name):
+    return f'skillswap:generation:{model_name}'
+
+
+def _initial_generation():
+    # Seeded from the clock so a generation lost to eviction never comes back
+    # lower than one that keyed entries still in the cache
+    return int(time.time() * 1000)
+
+
+def get_generations(model_names):
+    """Current generation of each model name, as a tuple in the given order"""
+    keys = [generation_key(name) for name in model_names]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, _initial_generation(), None)
+            found[key] = cache.get(key)
+    return tuple(found[key] for key in keys)
+
+
+def bump_generation(model_name):
+    """Invalidate everything cached against ``model_name`` once the transaction commits"""
+    def bump():
+        key = generation_key(model_name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, _initial_generation(), None)
+    transaction.on_commit(bump)
+
+
+def versioned_key(kind, name, model_names, vary_on=()):
+    generations = '.'.join(str(generation) for generation in get_generations(model_names))
+    digest = hashlib.md5(':'.join(str(value) for value in vary_on).encode()).hexdigest()
+    return f'skillswap:{kind}:{name}:{generations}:{digest}'
+
+
+def _count(kind, outcome):
+    key = f'skillswap:cache-stats:{kind}:{outcome}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def cache_stats():
+    """Hit/miss counters of the fragment and page caches"""
+    kinds = ('fragment', 'page')
+    keys = [f'skillswap:cache-stats:{kind}:{outcome}' for kind in kinds for outcome in ('hits', 'misses')]
+    values = cache.get_many(keys)
+    return {
+        kind: {outcome: values.get(f'skillswap:cache-stats:{kind}:{outcome}', 0) for outcome in ('hits', 'misses')}
+        for kind in kinds
+    }
+
+
+def get_fragment(name, model_names, vary_on, render, timeout=FRAGMENT_TIMEOUT):
+    """Cached output of ``render()`` for the current generations of ``model_names``"""
+    key = versioned_key('fragment', name, model_names, vary_on)
+    content = cache.get(key)
+    if content is not None:
+        _count('fragment', 'hits')
+        return content
+    _count('fragment', 'misses')
+    content = render()
+    cache.set(key, content, timeout)
+    return content
+
+
+def cache_anonymous_page(*model_names, timeout=PAGE_TIMEOUT):
+    """
+    Serve GET requests from anonymous users out of a full-page cache.
+
+    Only plain 200 responses that set no cookies are stored, and requests
+    carrying flash messages always render, so nothing per-visitor leaks
+    into a shared page.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (request.method not in ('GET', 'HEAD') or request.user.is_authenticated
+                    or len(messages.get_messages(request))):
+                return view(request, *args, **kwargs)
+
+            key = versioned_key('page', view.__name__, model_names, [request.get_full_path()])
+            cached = cache.get(key)
+            if cached is not None:
+                _count('page', 'hits')
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+
+            _count('page', 'misses')
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming and not response.cookies:
+                cache.set(key, (response.content, response['Content-Type']), timeout)
+            return response
+        return wrapper
+    return decorator
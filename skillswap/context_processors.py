@@ -0,0 +1,6 @@
+def unread_messages_count(request):
+    """Unread message count for the header badge, from the request's profile row"""
+    profile = getattr(request, 'profile', None)
+    if not profile:
+        return {}
+    return {'unread_count': profile.unread_messages}
@@ -0,0 +1,162 @@
+"""
+Maintenance of the ``Conversation`` inbox summaries.
+
+``record_message`` runs from the ``Message`` post_save signal and
+``mark_read`` from the chat views, so the inbox never has to scan ``Message``.
+``rebuild_conversations`` recreates every summary from the message table and
+``refresh_conversations`` just those of some pairs, after bulk changes.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Q
+from django.db.models.functions import Greatest
+
+from .models import ArchivedMessage, Conversation, Message
+
+SNIPPET_LENGTH = 120
+
+
+def snippet(content):
+    content = ' '.join(content.split())
+    if len(content) > SNIPPET_LENGTH:
+        content = content[:SNIPPET_LENGTH - 3] + '...'
+    return content
+
+
+def _upsert(owner_id, partner_id, message, unread_delta):
+    summary = {
+        'last_message_id': message.id,
+        'last_message_at': message.created_at,
+        'last_sender_id': message.sender_id,
+        'snippet': snippet(message.content),
+    }
+    updated = Conversation.objects.filter(owner_id=owner_id, partner_id=partner_id).update(
+        unread_count=F('unread_count') + unread_delta, **summary
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            Conversation.objects.create(
+                owner_id=owner_id, partner_id=partner_id, unread_count=unread_delta, **summary
+            )
+    except IntegrityError:
+        # Another request created the row first; fold this message into it
+        Conversation.objects.filter(owner_id=owner_id, partner_id=partner_id).update(
+            unread_count=F('unread_count') + unread_delta, **summary
+        )
+
+
+def record_message(message):
+    """Make ``message`` the latest entry in both participants' inboxes"""
+    _upsert(message.sender_id, message.receiver_id, message, 0)
+    _upsert(message.receiver_id, message.sender_id, message, 0 if message.is_read else 1)
+
+
+def mark_read(owner_id, partner_id):
+    """Everything ``partner`` sent to ``owner`` has been read"""
+    Conversation.objects.filter(
+        owner_id=owner_id, partner_id=partner_id, unread_count__gt=0
+    ).update(unread_count=0)
+
+
+def adjust_unread(owner_id, partner_id, amount):
+    Conversation.objects.filter(owner_id=owner_id, partner_id=partner_id).update(
+        unread_count=Greatest(F('unread_count') + amount, 0)
+    )
+
+
+def _latest_per_pair(directed_querysets, wanted=None):
+    """
+    Fold per-direction message aggregates into (last message id per pair,
+    unread count per (receiver, sender)), optionally only for ``wanted`` pairs.
+    """
+    last_ids = {}
+    unread = {}
+    rows = (row for directed in directed_querysets for row in directed.iterator())
+    for row in rows:
+        sender_id, receiver_id = row['sender_id'], row['receiver_id']
+        if sender_id == receiver_id:
+            continue
+        pair = (min(sender_id, receiver_id), max(sender_id, receiver_id))
+        if wanted is not None and pair not in wanted:
+            continue
+        last_ids[pair] = max(last_ids.get(pair, 0), row['last_id'])
+        unread[(receiver_id, sender_id)] = unread.get((receiver_id, sender_id), 0) + row['unread']
+    return last_ids, unread
+
+
+def _write_summaries(last_ids, unread, batch_size):
+    written = 0
+    pairs = list(last_ids.items())
+    for start in range(0, len(pairs), batch_size):
+        chunk = pairs[start:start + batch_size]
+        messages = Message.objects.in_bulk([last_id for _, last_id in chunk])
+        archived = {}
+        if len(messages) < len(chunk):
+            archived = ArchivedMessage.objects.in_bulk(
+                [last_id for _, last_id in chunk if last_id not in messages]
+            )
+        rows = []
+        for pair, last_id in chunk:
+            message = messages.get(last_id) or archived[last_id]
+            for owner_id, partner_id in (pair, pair[::-1]):
+                rows.append(Conversation(
+                    owner_id=owner_id,
+                    partner_id=partner_id,
+                    # Only hot messages can be referenced
+                    last_message_id=message.id if last_id in messages else None,
+                    last_message_at=message.created_at,
+                    last_sender_id=message.sender_id,
+                    snippet=snippet(message.content),
+                    unread_count=unread.get((owner_id, partner_id), 0),
+                ))
+        Conversation.objects.bulk_create(rows)
+        written += len(rows)
+    return written
+
+
+def _directed():
+    """Per-direction aggregates of the hot and the archived messages"""
+    return [
+        model.objects.order_by().values('sender_id', 'receiver_id').annotate(
+            last_id=Max('id'), unread=Count('id', filter=Q(is_read=False))
+        )
+        for model in (Message, ArchivedMessage)
+    ]
+
+
+def refresh_conversations(pairs, batch_size=1000):
+    """
+    Recompute the summaries of the given ``(profile id, profile id)`` pairs.
+
+    For bulk changes that bypass the per-message signals, such as deleting
+    or marking read many messages with one statement. Pairs with no
+    messages left lose their summaries.
+    """
+    wanted = {(min(a, b), max(a, b)) for a, b in pairs if a != b}
+    if not wanted:
+        return 0
+    users = {profile_id for pair in wanted for profile_id in pair}
+    # Messages among all the users involved, narrowed to the wanted pairs in Python
+    last_ids, unread = _latest_per_pair([
+        directed.filter(sender_id__in=users, receiver_id__in=users) for directed in _directed()
+    ], wanted)
+    stale = [
+        pk for pk, owner_id, partner_id in Conversation.objects.filter(
+            owner_id__in=users, partner_id__in=users
+        ).values_list('pk', 'owner_id', 'partner_id')
+        if (min(owner_id, partner_id), max(owner_id, partner_id)) in wanted
+    ]
+    Conversation.objects.filter(pk__in=stale).delete()
+    return _write_summaries(last_ids, unread, batch_size)
+
+
+def rebuild_conversations(batch_size=1000):
+    """
+    Recreate every conversation summary from the hot and the archived
+    messages. Returns the number of rows written.
+    """
+    last_ids, unread = _latest_per_pair(_directed())
+    Conversation.objects.all().delete()
+    return _write_summaries(last_ids, unread, batch_size)
@@ -0,0 +1,128 @@
+"""
+Denormalized per-profile counters.
+
+``UserProfile`` carries the numbers the dashboard shows (exchange counts by
+status, unread messages, review count/sum and the rating derived from them). They are adjusted in place with
+F-expressions from the signal handlers in ``skillswap.signals`` and from the
+views that bulk-mark messages read and the admin's bulk actions
+(``skillswap.bulk``), so they change in the same transaction as
+the row that caused them. ``recompute_counters`` rebuilds them from scratch
+and backs the ``reconcile_counters`` management command.
+"""
+
+from django.db.models import Case, F, FloatField, Func, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Cast, Coalesce
+
+from .models import Message, Review, SkillExchange, UserProfile
+
+# Exchange statuses that have a counter column on UserProfile
+EXCHANGE_COUNTER_FIELDS = {
+    'pending': 'exchanges_pending',
+    'accepted': 'exchanges_accepted',
+    'completed': 'exchanges_completed',
+}
+
+
+def adjust(profile_ids, **deltas):
+    """Add ``deltas`` (field=amount) to the counters of the given profiles"""
+    deltas = {field: F(field) + amount for field, amount in deltas.items() if amount}
+    if deltas and profile_ids:
+        UserProfile.objects.filter(pk__in=profile_ids).update(**deltas)
+
+
+def exchange_status_changed(exchange, old_status, new_status, amount=1):
+    """Move one exchange between status counters for both participants"""
+    if old_status == new_status:
+        return
+    deltas = {}
+    if old_status in EXCHANGE_COUNTER_FIELDS:
+        deltas[EXCHANGE_COUNTER_FIELDS[old_status]] = -amount
+    if new_status in EXCHANGE_COUNTER_FIELDS:
+        deltas[EXCHANGE_COUNTER_FIELDS[new_status]] = amount
+    adjust({exchange.requester_id, exchange.provider_id}, **deltas)
+
+
+def messages_unread(receiver_id, amount=1):
+    adjust([receiver_id], unread_messages=amount)
+
+
+def messages_read(receiver_id, amount=1):
+    if amount:
+        adjust([receiver_id], unread_messages=-amount)
+
+
+def _rating_update(count_delta, sum_delta):
+    """
+    UPDATE assignments moving a profile's rating by one review in O(1).
+
+    Every right-hand side reads the pre-update column values, so ``rating``
+    is computed from the new sum and count within the same statement.
+    """
+    new_count = F('rating_count') + count_delta
+    new_sum = F('rating_sum') + sum_delta
+    return {
+        'rating_count': new_count,
+        'rating_sum': new_sum,
+        'rating': Case(
+            When(rating_count__lte=-count_delta, then=Value(0.0)),
+            default=Cast(new_sum, FloatField()) / new_count,
+            output_field=FloatField(),
+        ),
+    }
+
+
+def review_added(reviewee_id, rating):
+    UserProfile.objects.filter(pk=reviewee_id).update(**_rating_update(1, rating))
+
+
+def review_removed(reviewee_id, rating):
+    UserProfile.objects.filter(pk=reviewee_id).update(**_rating_update(-1, -rating))
+
+
+def review_changed(reviewee_id, old_rating, new_rating):
+    if old_rating != new_rating:
+        UserProfile.objects.filter(pk=reviewee_id).update(**_rating_update(0, new_rating - old_rating))
+
+
+def aggregate_subquery(queryset, function, field='pk', output_field=None):
+    """Correlated scalar subquery computing ``function(field)`` over ``queryset``"""
+    output_field = output_field or IntegerField()
+    return Coalesce(
+        Subquery(
+            queryset.order_by().annotate(
+                value=Func(F(field), function=function, output_field=output_field)
+            ).values('value')[:1],
+            output_field=output_field,
+        ),
+        Value(0, output_field=output_field),
+    )
+
+
+def recompute_counters(profiles, batch_size=1000):
+    """
+    Recompute every counter for ``profiles`` with set-based UPDATEs.
+    Returns the number of profiles updated.
+    """
+    participant = Q(requester=OuterRef('pk')) | Q(provider=OuterRef('pk'))
+    reviews = Review.objects.filter(reviewee=OuterRef('pk'))
+    values = {
+        field: aggregate_subquery(SkillExchange.objects.filter(participant, status=status), 'COUNT')
+        for status, field in EXCHANGE_COUNTER_FIELDS.items()
+    }
+    values['unread_messages'] = aggregate_subquery(
+        Message.objects.filter(receiver=OuterRef('pk'), is_read=False), 'COUNT'
+    )
+    values['rating_count'] = aggregate_subquery(reviews, 'COUNT')
+    values['rating_sum'] = aggregate_subquery(reviews, 'SUM', 'rating')
+    values['rating'] = aggregate_subquery(reviews, 'AVG', 'rating', output_field=FloatField())
+
+    ids = profiles.order_by('pk').values_list('pk', flat=True)
+    last_id = 0
+    updated = 0
+    while True:
+        batch = list(ids.filter(pk__gt=last_id)[:batch_size])
+        if not batch:
+            break
+        updated += profiles.filter(pk__gte=batch[0], pk__lte=batch[-1]).update(**values)
+        last_id = batch[-1]
+    return updated
@@ -0,0 +1,63 @@
+"""
+Status transitions of skill exchanges.
+
+``transition`` moves an exchange along ``SkillExchange.TRANSITIONS`` with a
+single conditional ``UPDATE ... WHERE id = %s AND status = %s``: of two
+concurrent requests acting on the same exchange exactly one changes the row,
+and the other learns it lost from the row count, without any row locks. The
+winner records an ``ExchangeEvent`` in the same transaction, and the signal
+handler for that event adjusts the profile counters and caches, so they move
+once per transition however many requests raced for it.
+"""
+
+from django.db import router, transaction
+from django.utils import timezone
+
+from .models import ExchangeEvent, SkillExchange
+
+
+def can_transition(from_status, to_status):
+    return to_status in SkillExchange.TRANSITIONS.get(from_status, ())
+
+
+def sources(to_status):
+    """The statuses an exchange may move to ``to_status`` from"""
+    return [status for status, targets in SkillExchange.TRANSITIONS.items() if to_status in targets]
+
+
+def _apply(exchange, from_status, to_status, actor):
+    now = timezone.now()
+    with transaction.atomic():
+        won = SkillExchange.objects.filter(pk=exchange.pk, status=from_status).update(
+            status=to_status, updated_at=now,
+        )
+        if won:
+            ExchangeEvent.objects.create(
+                exchange=exchange, from_status=from_status, to_status=to_status, actor=actor,
+            )
+    if won:
+        exchange.status = exchange._saved_status = to_status
+        exchange.updated_at = now
+    return bool(won)
+
+
+def transition(exchange, to_status, actor=None):
+    """
+    Move ``exchange`` to ``to_status`` if the transition table allows it from
+    its current status.
+
+    Returns True if this call made the change. Returns False if the move is
+    not allowed or another request changed the status first; ``exchange``
+    then holds the stored status.
+    """
+    if can_transition(exchange.status, to_status) and _apply(exchange, exchange.status, to_status, actor):
+        return True
+    # Lost a race, or read a stale copy (e.g. from a lagging replica): try
+    # once more from the stored status
+    read_status = exchange.status
+    primary = router.db_for_write(SkillExchange, instance=exchange)
+    exchange.refresh_from_db(using=primary, fields=['status', 'updated_at'])
+    exchange._saved_status = exchange.status
+    if exchange.status != read_status and can_transition(exchange.status, to_status):
+        return _apply(exchange, exchange.status, to_status, actor)
+    return False
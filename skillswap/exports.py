@@ -0,0 +1,118 @@
+"""
+Streaming CSV and JSON Lines exports of exchanges, messages and reviews.
+
+An export is a single ``values_list`` query with the related usernames and
+skill names joined in, read with ``.iterator(chunk_size=...)`` and written
+out one row at a time, so memory stays flat however large the table is.
+Used by the export actions in the admin and by ``manage.py export``.
+"""
+
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import ArchivedMessage, Message, Review, SkillExchange
+
+CHUNK_SIZE = 2000
+
+# Export name -> (model, [(column, field path)])
+EXPORTS = {
+    'exchanges': (SkillExchange, [
+        ('id', 'id'),
+        ('requester', 'requester__user__username'),
+        ('provider', 'provider__user__username'),
+        ('skill_offered', 'skill_offered__name'),
+        ('skill_requested', 'skill_requested__name'),
+        ('status', 'status'),
+        ('message', 'message'),
+        ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+    ]),
+    'messages': (Message, [
+        ('id', 'id'),
+        ('sender', 'sender__user__username'),
+        ('receiver', 'receiver__user__username'),
+        ('exchange_id', 'exchange_id'),
+        ('content', 'content'),
+        ('is_read', 'is_read'),
+        ('created_at', 'created_at'),
+    ]),
+    'archived_messages': (ArchivedMessage, [
+        ('id', 'id'),
+        ('sender', 'sender__user__username'),
+        ('receiver', 'receiver__user__username'),
+        ('exchange_id', 'exchange_id'),
+        ('content', 'content'),
+        ('created_at', 'created_at'),
+    ]),
+    'reviews': (Review, [
+        ('id', 'id'),
+        ('reviewer', 'reviewer__user__username'),
+        ('reviewee', 'reviewee__user__username'),
+        ('exchange_id', 'exchange_id'),
+        ('rating', 'rating'),
+        ('comment', 'comment'),
+        ('created_at', 'created_at'),
+    ]),
+}
+
+# Format -> (content type, file extension)
+FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+}
+
+
+def export_for_model(model):
+    """The export name and columns for ``model``"""
+    for name, (export_model, columns) in EXPORTS.items():
+        if export_model is model:
+            return name, columns
+    raise LookupError(f'No export defined for {model._meta.label}')
+
+
+class _Line:
+    """File-like target for csv.writer that hands back each formatted row"""
+
+    def write(self, value):
+        return value
+
+
+def _format_value(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def stream_rows(queryset, columns, export_format='csv', chunk_size=CHUNK_SIZE):
+    """
+    Yield ``queryset`` as lines of CSV or JSON Lines, header first for CSV.
+
+    Rows come in primary key order, from one query that fetches
+    ``chunk_size`` rows at a time.
+    """
+    names = [name for name, _ in columns]
+    rows = queryset.order_by('pk').values_list(*[path for _, path in columns]).iterator(chunk_size=chunk_size)
+    if export_format == 'csv':
+        writer = csv.writer(_Line())
+        yield writer.writerow(names)
+        for row in rows:
+            yield writer.writerow([_format_value(value) for value in row])
+    elif export_format == 'jsonl':
+        encoder = DjangoJSONEncoder(ensure_ascii=False)
+        for row in rows:
+            yield encoder.encode(dict(zip(names, row))) + '\n'
+    else:
+        raise ValueError(f'Unknown export format {export_format!r}')
+
+
+def streaming_response(queryset, export_format='csv', chunk_size=CHUNK_SIZE):
+    """A download of ``queryset`` in ``export_format``, streamed as it is read"""
+    name, columns = export_for_model(queryset.model)
+    content_type, extension = FORMATS[export_format]
+    response = StreamingHttpResponse(
+        stream_rows(queryset, columns, export_format, chunk_size), content_type=content_type,
+    )
+    filename = f'{name}-{timezone.now():%Y%m%d-%H%M%S}.{extension}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
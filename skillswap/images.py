@@ -0,0 +1,159 @@
+"""
+Resized derivatives of uploaded images.
+
+Every ``ImageField`` with a sibling ``<field>_derivatives`` JSON field gets
+thumb/card/full copies in its original format (JPEG, or PNG when the upload
+has transparency) and in WebP. Copies are stored next to the original under
+names that embed a hash of its content, so they can be cached forever and a
+replaced upload never reuses a stale URL. Generation is a queued task (see
+``skillswap.tasks``); until it has run, and whenever the recorded source no
+longer matches the field, templates fall back to the original.
+
+Pillow is imported by the functions that decode images, so web processes
+that only read ``<field>_derivatives`` never load it.
+"""
+
+import hashlib
+import io
+import logging
+import os
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+
+from .cache import bump_generation
+from .tasks import task
+
+logger = logging.getLogger(__name__)
+
+# Longest edge in pixels; images are never upscaled
+SIZES = {
+    'thumb': 160,
+    'card': 640,
+    'full': 1600,
+}
+
+QUALITY = {'JPEG': 82, 'WEBP': 80}
+
+# (model label, image field) pairs that carry derivatives
+IMAGE_FIELDS = [
+    ('skillswap.UserProfile', 'profile_picture'),
+    ('skillswap.Skill', 'image'),
+]
+
+
+class InvalidImage(Exception):
+    """The uploaded file is not an image Pillow can decode"""
+
+
+def derivatives_field(field_name):
+    return f'{field_name}_derivatives'
+
+
+def derivative_name(source_name, digest, size, extension):
+    root, _ = os.path.splitext(source_name)
+    return f'{root}.{digest}.{size}.{extension}'
+
+
+def is_current(fieldfile, derivatives):
+    """Whether ``derivatives`` were built from the file ``fieldfile`` points at"""
+    return bool(fieldfile) and bool(derivatives) and derivatives.get('source') == fieldfile.name
+
+
+def _encode(image, image_format):
+    buffer = io.BytesIO()
+    options = {}
+    if image_format in QUALITY:
+        options['quality'] = QUALITY[image_format]
+    if image_format == 'JPEG':
+        options.update(optimize=True, progressive=True)
+    elif image_format == 'PNG':
+        options['optimize'] = True
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def build_derivatives(fieldfile):
+    """Write every size and format of ``fieldfile`` and describe them"""
+    from PIL import Image, ImageOps
+
+    with fieldfile.open('rb') as source:
+        data = source.read()
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    storage = fieldfile.storage
+
+    # Decoding reads only the bytes already in memory, so its errors are
+    # about the file itself; storage errors above and below propagate and
+    # are retried by the task queue
+    try:
+        with Image.open(io.BytesIO(data)) as opened:
+            image = ImageOps.exif_transpose(opened)
+            has_alpha = image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+    except (OSError, ValueError, Image.DecompressionBombError) as error:
+        raise InvalidImage(fieldfile.name) from error
+    formats = [('PNG', 'png') if has_alpha else ('JPEG', 'jpg'), ('WEBP', 'webp')]
+
+    sizes = {}
+    for size, edge in SIZES.items():
+        resized = image.copy()
+        resized.thumbnail((edge, edge), Image.LANCZOS)
+        entry = {'width': resized.width, 'height': resized.height}
+        for image_format, extension in formats:
+            name = derivative_name(fieldfile.name, digest, size, extension)
+            if not storage.exists(name):
+                name = storage.save(name, ContentFile(_encode(resized, image_format)))
+            entry['webp' if image_format == 'WEBP' else 'fallback'] = name
+        sizes[size] = entry
+    return {'source': fieldfile.name, 'sizes': sizes}
+
+
+def generate(model_label, pk, field_name, force=False):
+    """
+    Bring the derivatives of one image up to date.
+
+    The result is only written if the image has not been replaced in the
+    meantime. Returns True when the row was updated. Files that cannot be
+    decoded are logged and skipped; storage errors are raised so the task
+    is retried.
+    """
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return False
+    fieldfile = getattr(instance, field_name)
+    current = getattr(instance, derivatives_field(field_name))
+    if fieldfile:
+        if is_current(fieldfile, current) and not force:
+            return False
+        try:
+            derivatives = build_derivatives(fieldfile)
+        except InvalidImage:
+            logger.exception('Could not build derivatives of %s', fieldfile.name)
+            return False
+    elif current:
+        derivatives = {}
+    else:
+        return False
+
+    updated = model.objects.filter(pk=pk, **{field_name: fieldfile.name}).update(
+        **{derivatives_field(field_name): derivatives}
+    )
+    if updated:
+        # update() sends no signals; cached pages still embed the old URLs
+        bump_generation(model._meta.model_name)
+    return bool(updated)
+
+
+@task
+def build(model_label, pk, field_name):
+    generate(model_label, pk, field_name)
+
+
+def schedule(instance, field_name):
+    """Queue regeneration of the derivatives of ``instance`` if they are out of date"""
+    fieldfile = getattr(instance, field_name)
+    current = getattr(instance, derivatives_field(field_name))
+    if is_current(fieldfile, current) or (not fieldfile and not current):
+        return
+    build.enqueue(instance._meta.label, instance.pk, field_name)
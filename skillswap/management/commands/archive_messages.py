@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from skillswap import archive
+
+
+class Command(BaseCommand):
+    help = (
+        'Move read messages older than the hot window into the archive table, '
+        'in batches. Safe to run repeatedly, e.g. nightly from cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=archive.get_setting('MESSAGE_AGE_DAYS'),
+                            help='Archive read messages older than this (default: SKILLSWAP_ARCHIVE setting)')
+        parser.add_argument('--batch-size', type=int, default=archive.get_setting('BATCH_SIZE'),
+                            help='Messages moved per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the messages that would move')
+
+    def handle(self, *args, **options):
+        if options['older_than_days'] < 0 or options['batch_size'] < 1:
+            raise CommandError('--older-than-days must be at least 0 and --batch-size at least 1')
+        queryset = archive.archivable(timedelta(days=options['older_than_days']))
+        if options['dry_run']:
+            self.stdout.write(f'{queryset.count()} messages would be archived.')
+            return
+        moved = archive.archive_messages(
+            queryset, batch_size=options['batch_size'],
+            progress=lambda done, total: self.stdout.write(f'  {done}/{total}'),
+        )
+        self.stdout.write(self.style.SUCCESS(f'Archived {moved} messages.'))
@@ -0,0 +1,40 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from skillswap import images
+
+
+class Command(BaseCommand):
+    help = 'Generate missing or outdated thumb/card/full derivatives for uploaded images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Number of rows read per query')
+        parser.add_argument('--force', action='store_true',
+                            help='Rebuild derivatives even when they look current')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total = 0
+        for model_label, field_name in images.IMAGE_FIELDS:
+            model = apps.get_model(model_label)
+            rows = (
+                model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+                .only('id', field_name, images.derivatives_field(field_name)).order_by('id')
+            )
+            last_id = 0
+            generated = 0
+            while True:
+                batch = list(rows.filter(id__gt=last_id)[:batch_size])
+                if not batch:
+                    break
+                for instance in batch:
+                    if options['force'] or not images.is_current(
+                        getattr(instance, field_name), getattr(instance, images.derivatives_field(field_name))
+                    ):
+                        generated += images.generate(model_label, instance.pk, field_name, force=options['force'])
+                last_id = batch[-1].id
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {generated} images processed')
+            total += generated
+
+        self.stdout.write(self.style.SUCCESS(f'Generated derivatives for {total} images.'))
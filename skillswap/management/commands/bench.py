@@ -0,0 +1,160 @@
+import json
+import math
+import statistics
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import F
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+
+from skillswap import urls as skillswap_urls
+from skillswap.models import Conversation, Skill, SkillExchange, UserProfile
+
+# Views that change state on GET or hold the connection open
+SKIPPED_URLS = {'logout', 'exchange_complete', 'chat_stream', 'exchange_chat_stream'}
+
+
+class Rollback(Exception):
+    pass
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Request every URL in skillswap/urls.py through the test client and print '
+        'p50/p95 latency and query counts per view as JSON. Anything the requests '
+        'write is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20,
+                            help='Measured requests per URL')
+        parser.add_argument('--warmup', type=int, default=2,
+                            help='Unmeasured requests per URL before timing')
+        parser.add_argument('--username',
+                            help='User to log in as (defaults to the busiest profile)')
+        parser.add_argument('--anonymous', action='store_true',
+                            help='Do not log in')
+        parser.add_argument('--cold-cache', action='store_true',
+                            help='Clear the cache before every request')
+        parser.add_argument('--only', nargs='+', metavar='URL_NAME',
+                            help='Benchmark only these URL names')
+        parser.add_argument('--output', help='Also write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1')
+        profile = self.pick_profile(options['username'])
+        client = Client(HTTP_HOST='localhost')
+        if not options['anonymous']:
+            client.force_login(profile.user)
+
+        results = {}
+        try:
+            with transaction.atomic():
+                for name, path in self.targets(profile, options['only']):
+                    results[name] = self.measure(client, path, options)
+                raise Rollback
+        except Rollback:
+            pass
+
+        report = {
+            'meta': {
+                'timestamp': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'user': None if options['anonymous'] else profile.user.username,
+                'iterations': options['iterations'],
+                'warmup': options['warmup'],
+                'cold_cache': options['cold_cache'],
+            },
+            'results': results,
+        }
+        output = json.dumps(report, indent=2)
+        self.stdout.write(output)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output + '\n')
+
+    def pick_profile(self, username):
+        profiles = UserProfile.objects.select_related('user')
+        if username:
+            profile = profiles.filter(user__username=username).first()
+        else:
+            profile = profiles.order_by(
+                (F('exchanges_pending') + F('exchanges_accepted') + F('exchanges_completed')).desc(), 'pk'
+            ).first()
+        if profile is None:
+            raise CommandError('No profile to benchmark with; run `manage.py seed` first.')
+        return profile
+
+    def sample_kwargs(self, profile):
+        """Realistic URL arguments for ``profile``: its own and its partners' rows"""
+        own_skill = Skill.objects.filter(owner=profile).values_list('pk', flat=True).first()
+        other_skill = Skill.objects.exclude(owner=profile).values_list('pk', flat=True).first()
+        exchange = (
+            SkillExchange.objects.filter(provider=profile).order_by('-pk').first()
+            or SkillExchange.objects.filter(requester=profile).order_by('-pk').first()
+        )
+        partner = (
+            Conversation.objects.filter(owner=profile).select_related('partner__user')
+            .order_by('-last_message_at').first()
+        )
+        return {
+            'username': partner.partner.user.username if partner else profile.user.username,
+            'pk': own_skill or other_skill,
+            'skill_id': other_skill,
+            'exchange_id': exchange.pk if exchange else None,
+        }
+
+    def targets(self, profile, only):
+        samples = self.sample_kwargs(profile)
+        # The public profile page shows the benchmarked user, not the chat partner
+        overrides = {'profile': {'username': profile.user.username}}
+        for pattern in skillswap_urls.urlpatterns:
+            if not isinstance(pattern, URLPattern) or pattern.name in SKIPPED_URLS:
+                continue
+            if only and pattern.name not in only:
+                continue
+            kwargs = {
+                name: overrides.get(pattern.name, {}).get(name, samples.get(name))
+                for name in pattern.pattern.converters
+            }
+            if None in kwargs.values():
+                self.stderr.write(f'Skipping {pattern.name}: no sample data')
+                continue
+            yield pattern.name, reverse(pattern.name, kwargs=kwargs)
+
+    def measure(self, client, path, options):
+        timings = []
+        queries = []
+        status = None
+        for iteration in range(options['warmup'] + options['iterations']):
+            if options['cold_cache']:
+                cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(path)
+                elapsed = (time.perf_counter() - started) * 1000
+            status = response.status_code
+            if iteration >= options['warmup']:
+                timings.append(elapsed)
+                queries.append(len(captured))
+        return {
+            'path': path,
+            'status': status,
+            'p50_ms': round(percentile(timings, 0.5), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'mean_ms': round(statistics.fmean(timings), 3),
+            'queries': round(statistics.median(queries)),
+            'max_queries': max(queries),
+        }
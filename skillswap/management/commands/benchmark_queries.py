@@ -0,0 +1,146 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from skillswap.models import UserProfile, Skill, SkillExchange, Message, Conversation
+from skillswap.seeding import seed
+
+# Indexes added for the hot queries below; dropped for the "before" run
+BENCHMARK_INDEXES = [
+    (Skill, 'skill_category_created_idx'),
+    (SkillExchange, 'exchange_requester_idx'),
+    (SkillExchange, 'exchange_provider_idx'),
+    (Message, 'message_pair_idx'),
+    (Message, 'message_unread_idx'),
+]
+
+# Single-column foreign key indexes that migration 0007 replaced with the ones
+# above; recreated for the "before" run so it measures the original schema
+REPLACED_FK_INDEXES = [
+    (Message, 'sender'),
+    (SkillExchange, 'requester'),
+    (SkillExchange, 'provider'),
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed throwaway data, then print EXPLAIN plans and timings for the hot '
+        'queries in skillswap.views with their composite indexes and with the '
+        'single-column foreign key indexes they replaced. '
+        'Everything runs in one transaction that is rolled back at the end.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument('--skills', type=int, default=5000)
+        parser.add_argument('--exchanges', type=int, default=5000)
+        parser.add_argument('--messages', type=int, default=50000)
+        parser.add_argument('--repeat', type=int, default=20,
+                            help='Executions per query; the median is reported')
+        parser.add_argument('--no-seed', action='store_true',
+                            help='Benchmark against the existing data only')
+
+    def handle(self, *args, **options):
+        self.repeat = options['repeat']
+        self.stdout.write(f'Database: {connection.vendor}')
+        try:
+            with transaction.atomic():
+                if not options['no_seed']:
+                    self.seed(options)
+                self.benchmark()
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, options):
+        started = time.perf_counter()
+        seed(users=options['users'], skills=options['skills'], exchanges=options['exchanges'],
+             messages=options['messages'], prefix='bench')
+        self.stdout.write(f'Seeded data in {time.perf_counter() - started:.2f}s')
+
+    def hot_queries(self):
+        profile = (
+            UserProfile.objects.filter(messages_received__isnull=False)
+            .order_by('-pk').first() or UserProfile.objects.first()
+        )
+        if profile is None:
+            return []
+        partner_id = (
+            Message.objects.filter(receiver=profile).values_list('sender_id', flat=True).first()
+            or profile.id
+        )
+        pair = Q(sender=profile, receiver_id=partner_id) | Q(sender_id=partner_id, receiver=profile)
+        participant = Q(requester=profile) | Q(provider=profile)
+        return [
+            ('browse_skills by category',
+             Skill.objects.select_related('owner__user').filter(category='programming')
+             .order_by('-created_at', '-id')[:25]),
+            ('chat window',
+             Message.objects.filter(pair).order_by('-id')[:51]),
+            ('chat since-id',
+             Message.objects.filter(pair, id__gt=0).order_by('id')[:101]),
+            ('unread for receiver',
+             Message.objects.filter(receiver=profile, is_read=False).values('id')),
+            ('dashboard exchanges',
+             SkillExchange.objects.filter(participant).order_by('-created_at')),
+            ('pending exchange count',
+             SkillExchange.objects.filter(participant, status='pending').values('id')),
+            ('inbox',
+             Conversation.objects.filter(owner=profile).order_by('-last_message_at', '-id')[:31]),
+        ]
+
+    def measure(self, queryset):
+        timings = []
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            list(queryset.all())
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), queryset.explain()
+
+    def run_all(self):
+        return {label: self.measure(queryset) for label, queryset in self.hot_queries()}
+
+    def set_indexes(self, present):
+        # Only render the DDL: SQLite refuses a live schema editor inside atomic()
+        editor = connection.schema_editor(collect_sql=True)
+        with connection.cursor() as cursor:
+            for model, name in BENCHMARK_INDEXES:
+                index = next(index for index in model._meta.indexes if index.name == name)
+                if present:
+                    cursor.execute(str(index.create_sql(model, editor)))
+                else:
+                    cursor.execute(str(index.remove_sql(model, editor)))
+            for model, field_name in REPLACED_FK_INDEXES:
+                field = model._meta.get_field(field_name)
+                # The name Django gives a db_index=True foreign key
+                name = editor._create_index_name(model._meta.db_table, [field.column])
+                if present:
+                    cursor.execute(str(editor._delete_index_sql(model, name)))
+                else:
+                    cursor.execute(str(editor._create_index_sql(model, fields=[field], name=name)))
+            cursor.execute('ANALYZE')
+
+    def benchmark(self):
+        self.set_indexes(False)
+        before = self.run_all()
+        self.set_indexes(True)
+        after = self.run_all()
+
+        for label, (before_ms, before_plan) in before.items():
+            after_ms, after_plan = after[label]
+            self.stdout.write(self.style.MIGRATE_HEADING(f'\n{label}'))
+            self.stdout.write(f'  before: {before_ms:8.3f} ms')
+            self.stdout.write(self.indent(before_plan))
+            self.stdout.write(f'  after:  {after_ms:8.3f} ms')
+            self.stdout.write(self.indent(after_plan))
+
+    def indent(self, plan):
+        return '\n'.join(f'      {line}' for line in plan.splitlines())
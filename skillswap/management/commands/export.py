@@ -0,0 +1,67 @@
+from django.contrib import admin
+from django.contrib.admin.utils import prepare_lookup_value
+from django.contrib.admin.views.main import (
+    ALL_VAR, ERROR_FLAG, IS_POPUP_VAR, ORDER_VAR, PAGE_VAR, SEARCH_VAR, TO_FIELD_VAR,
+)
+from django.core.exceptions import FieldError, ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+
+from skillswap import exports
+
+# Changelist parameters that do not filter rows
+NON_FILTER_PARAMS = {ALL_VAR, ERROR_FLAG, IS_POPUP_VAR, ORDER_VAR, PAGE_VAR, TO_FIELD_VAR, '_changelist_filters'}
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream exchanges, messages or reviews as CSV or JSON Lines in constant memory. '
+        '--query takes the query string of an admin changelist URL, e.g. '
+        '"status__exact=completed&q=alice", to export the rows that page shows.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('export', choices=sorted(exports.EXPORTS))
+        parser.add_argument('--format', choices=sorted(exports.FORMATS), default='csv')
+        parser.add_argument('--output', '-o', default='-', help='File to write (default: stdout)')
+        parser.add_argument('--query', default='', help='Admin changelist filters and search')
+        parser.add_argument('--chunk-size', type=int, default=exports.CHUNK_SIZE,
+                            help='Rows fetched from the database at a time')
+
+    def handle(self, *args, **options):
+        model, columns = exports.EXPORTS[options['export']]
+        # The CSV header is not a row
+        count = -1 if options['format'] == 'csv' else 0
+        try:
+            queryset = self.filter(model, QueryDict(options['query']))
+            lines = exports.stream_rows(queryset, columns, options['format'], options['chunk_size'])
+            if options['output'] == '-':
+                for line in lines:
+                    self.stdout.write(line, ending='')
+                    count += 1
+            else:
+                with open(options['output'], 'w', newline='', encoding='utf-8') as handle:
+                    for line in lines:
+                        handle.write(line)
+                        count += 1
+        except (FieldError, ValidationError, ValueError) as error:
+            raise CommandError(f'Invalid --query: {error}')
+        self.stderr.write(f'Exported {max(count, 0)} {options["export"]}.')
+
+    def filter(self, model, params):
+        """Apply changelist filters and search the way the model's admin does"""
+        admin.autodiscover()
+        model_admin = admin.site._registry[model]
+        queryset = model._default_manager.all()
+        filters = {
+            key: prepare_lookup_value(key, value)
+            for key, value in params.items()
+            if key not in NON_FILTER_PARAMS and key != SEARCH_VAR
+        }
+        queryset = queryset.filter(**filters)
+        search = params.get(SEARCH_VAR, '')
+        if search:
+            queryset, may_have_duplicates = model_admin.get_search_results(None, queryset, search)
+            if may_have_duplicates:
+                queryset = queryset.distinct()
+        return queryset
@@ -0,0 +1,160 @@
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter: import the entry point, then serve two requests
+# through it. Timings go to stdout; -X importtime writes to stderr, where the
+# phase markers split the imports between boot and the first request.
+PROBE = r'''
+import io, json, sys, time
+started = time.perf_counter()
+module_name, _, attribute = sys.argv[1].partition(':')
+module = __import__(module_name, fromlist=['_'])
+application = getattr(module, attribute or 'application')
+booted = time.perf_counter()
+print('startup-phase request', file=sys.stderr, flush=True)
+
+def request(path):
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '', 'SCRIPT_NAME': '',
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+        'SERVER_PROTOCOL': 'HTTP/1.1', 'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr, 'wsgi.multithread': False, 'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    status = []
+    response = application(environ, lambda line, headers, exc_info=None: status.append(line))
+    try:
+        b''.join(response)
+    finally:
+        getattr(response, 'close', lambda: None)()
+    return status[0]
+
+status = request(sys.argv[2])
+first = time.perf_counter()
+print('startup-phase warm', file=sys.stderr, flush=True)
+request(sys.argv[2])
+warm = time.perf_counter()
+print(json.dumps({
+    'status': status,
+    'boot_ms': (booted - started) * 1000,
+    'first_request_ms': (first - booted) * 1000,
+    'warm_request_ms': (warm - first) * 1000,
+    'modules': len(sys.modules),
+}))
+'''
+
+IMPORT_LINE = re.compile(r'^import time:\s+(?P<self>\d+) \|\s+\d+ \| *(?P<name>\S+)')
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure a cold start of the WSGI entry point in fresh interpreters: time to '
+        'import it, time to the first and a warm response, and import time per module.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entry', default='api.wsgi:app',
+                            help='module:attribute of the WSGI application (default: api.wsgi:app)')
+        parser.add_argument('--path', default='/login/', help='Path of the first request')
+        parser.add_argument('--runs', type=int, default=5, help='Cold starts to measure; medians are reported')
+        parser.add_argument('--top', type=int, default=20, help='Modules to list')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError('--runs must be at least 1')
+        runs = [self.cold_start(options['entry'], options['path']) for _ in range(options['runs'])]
+        report = self.summarize(runs, options['top'])
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.print_report(report, options)
+
+    def cold_start(self, entry, path):
+        env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [
+            str(settings.BASE_DIR), os.environ.get('PYTHONPATH'),
+        ]))}
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROBE, entry, path],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(f'Cold start failed:\n{result.stderr[-2000:]}')
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+
+        # Self time per module, split by phase
+        phase = 'boot'
+        timings['imports'] = {'boot': {}, 'request': {}}
+        for line in result.stderr.splitlines():
+            if line.startswith('startup-phase '):
+                phase = line.split()[1]
+                continue
+            match = IMPORT_LINE.match(line)
+            if match and phase in timings['imports']:
+                timings['imports'][phase][match['name']] = int(match['self']) / 1000
+        return timings
+
+    def summarize(self, runs, top):
+        def median(key):
+            return round(statistics.median(run[key] for run in runs), 1)
+
+        report = {
+            'runs': len(runs),
+            'status': runs[-1]['status'],
+            'boot_ms': median('boot_ms'),
+            'first_request_ms': median('first_request_ms'),
+            'warm_request_ms': median('warm_request_ms'),
+            'modules_loaded': runs[-1]['modules'],
+        }
+        for phase in ('boot', 'request'):
+            self_ms = defaultdict(list)
+            for run in runs:
+                for name, self_time in run['imports'][phase].items():
+                    self_ms[name].append(self_time)
+            medians = {name: statistics.median(values) for name, values in self_ms.items()}
+            packages = defaultdict(float)
+            for name, value in medians.items():
+                packages[name.split('.')[0]] += value
+            report[f'{phase}_imports'] = {
+                'modules': len(medians),
+                'total_ms': round(sum(medians.values()), 1),
+                'by_package': {
+                    name: round(value, 1)
+                    for name, value in sorted(packages.items(), key=lambda item: -item[1])[:top]
+                },
+                'slowest_modules': {
+                    name: round(value, 2)
+                    for name, value in sorted(medians.items(), key=lambda item: -item[1])[:top]
+                },
+            }
+        return report
+
+    def print_report(self, report, options):
+        self.stdout.write(
+            f"{options['entry']}, GET {options['path']} -> {report['status']} "
+            f"(median of {report['runs']} cold starts)"
+        )
+        self.stdout.write(f"  boot:          {report['boot_ms']:8.1f} ms")
+        self.stdout.write(f"  first request: {report['first_request_ms']:8.1f} ms")
+        self.stdout.write(f"  warm request:  {report['warm_request_ms']:8.1f} ms")
+        self.stdout.write(
+            f"  time to first response: {report['boot_ms'] + report['first_request_ms']:.1f} ms, "
+            f"{report['modules_loaded']} modules loaded"
+        )
+        for phase, title in (('boot', 'Imported at boot'), ('request', 'Imported by the first request')):
+            imports = report[f'{phase}_imports']
+            self.stdout.write(f"\n{title}: {imports['modules']} modules, {imports['total_ms']} ms self time")
+            self.stdout.write('  by package:')
+            for name, value in imports['by_package'].items():
+                self.stdout.write(f'    {value:8.1f} ms  {name}')
+            self.stdout.write('  slowest modules:')
+            for name, value in imports['slowest_modules'].items():
+                self.stdout.write(f'    {value:8.2f} ms  {name}')
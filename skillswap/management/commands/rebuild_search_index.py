@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from skillswap import search
+from skillswap.models import Skill
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the skill full-text search index in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of skills indexed per transaction')
+        parser.add_argument('--clear', action='store_true',
+                            help='Empty the index before rebuilding it')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if options['clear']:
+            search.clear_index()
+
+        skills = Skill.objects.only('id', 'name', 'description').order_by('id')
+        last_id = 0
+        total = 0
+        while True:
+            batch = list(skills.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            with transaction.atomic():
+                search.index_skills(batch)
+            last_id = batch[-1].id
+            total += len(batch)
+            self.stdout.write(f'Indexed {total} skills...')
+
+        self.stdout.write(self.style.SUCCESS(f'Search index rebuilt for {total} skills.'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from skillswap.counters import recompute_counters
+from skillswap.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized exchange, message and review counters on every profile'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of profiles recomputed per UPDATE')
+
+    def handle(self, *args, **options):
+        updated = recompute_counters(UserProfile.objects.all(), batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Reconciled counters for {updated} profiles.'))
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from skillswap import tasks
+
+
+class Command(BaseCommand):
+    help = 'Run queued background tasks from the database until interrupted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10,
+                            help='Number of tasks claimed at a time')
+        parser.add_argument('--sleep', type=float, default=2.0,
+                            help='Seconds to wait when the queue is empty')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit as soon as no task is due (e.g. from cron)')
+
+    def handle(self, *args, **options):
+        worker = tasks.worker_id()
+        self.stdout.write(f'Worker {worker} started')
+        succeeded = failed = 0
+        try:
+            while True:
+                ok, errors = tasks.run_pending(worker, options['batch_size'])
+                succeeded += ok
+                failed += errors
+                if ok or errors:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f'Ran {succeeded} tasks, {failed} failed.'))
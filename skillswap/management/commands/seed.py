@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from skillswap.seeding import seed
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk-create synthetic users, skills, exchanges, reviews and message threads '
+        'with realistic distributions, then rebuild counters and indexes'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--skills', type=int, default=3000)
+        parser.add_argument('--exchanges', type=int, default=5000)
+        parser.add_argument('--messages', type=int, default=100000)
+        parser.add_argument('--review-rate', type=float, default=0.7,
+                            help='Chance that each side of a completed exchange leaves a review')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Rows per INSERT')
+        parser.add_argument('--random-seed', type=int, default=42,
+                            help='Seed for reproducible data')
+        parser.add_argument('--prefix', default='seed',
+                            help='Username prefix of the generated users')
+        parser.add_argument('--password', default='password',
+                            help='Password shared by every generated user')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        with transaction.atomic():
+            counts = seed(
+                users=options['users'],
+                skills=options['skills'],
+                exchanges=options['exchanges'],
+                messages=options['messages'],
+                review_rate=options['review_rate'],
+                batch_size=options['batch_size'],
+                random_seed=options['random_seed'],
+                prefix=options['prefix'],
+                password=options['password'],
+                log=self.stdout.write,
+            )
+        summary = ', '.join(f'{count} {table}' for table, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f'Seeded {summary} in {time.perf_counter() - started:.1f}s.'))
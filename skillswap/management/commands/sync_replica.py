@@ -0,0 +1,60 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy a SQLite primary database into a SQLite replica, to try the read '
+        'replica router locally. With --lag, keep copying until interrupted, each '
+        'copy published LAG seconds after it was taken, so the replica trails the '
+        'primary by LAG to 2 x LAG seconds like a lagging streaming replica.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='replica', help='Replica alias (default: replica)')
+        parser.add_argument('--lag', type=float, default=0,
+                            help='Seconds between taking and publishing each copy (default: copy once)')
+
+    def handle(self, *args, **options):
+        primary = self.sqlite_path(DEFAULT_DB_ALIAS)
+        replica = self.sqlite_path(options['database'])
+        if options['lag'] <= 0:
+            source = sqlite3.connect(primary)
+            try:
+                self.copy(source, replica)
+            finally:
+                source.close()
+            self.stdout.write(self.style.SUCCESS(f'Copied {primary} to {replica}.'))
+            return
+        copies = 0
+        try:
+            while True:
+                snapshot = sqlite3.connect(':memory:')
+                with sqlite3.connect(primary) as source:
+                    source.backup(snapshot)
+                time.sleep(options['lag'])
+                self.copy(snapshot, replica)
+                snapshot.close()
+                copies += 1
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f'Published {copies} copies of {primary} to {replica}.'))
+
+    def sqlite_path(self, alias):
+        if alias not in settings.DATABASES:
+            raise CommandError(f'No database {alias!r}; set DATABASE_REPLICA_URL, e.g. sqlite:///db-replica.sqlite3')
+        database = settings.DATABASES[alias]
+        if database['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError(f'Database {alias!r} is not SQLite; use your database\'s own replication.')
+        return str(database['NAME'])
+
+    def copy(self, source, replica):
+        target = sqlite3.connect(replica)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
@@ -0,0 +1,205 @@
+"""
+Per-view request metrics in Prometheus text format.
+
+``MetricsMiddleware`` (skillswap.middleware) times every request and,
+through ``connection.execute_wrapper``, the SQL it runs; the
+``InstrumentedDjangoTemplates`` backend adds template render time. Results
+are kept per URL name in process memory, the same model as the Prometheus
+client libraries: every worker exposes its own series and the scraper sums
+them. ``render()`` produces the text served by the ``metrics`` view.
+
+Configured with ``SKILLSWAP_METRICS``.
+"""
+
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates, Template
+
+DEFAULTS = {
+    'ENABLED': True,
+    'SLOW_REQUEST_MS': 1000,
+    # Statements kept per request for the slow-request log
+    'SLOW_REQUEST_MAX_QUERIES': 50,
+    # Bearer token that grants access to the endpoint without a staff session
+    'TOKEN': '',
+}
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# (name, help, buckets) of every histogram, labelled by view and method
+HISTOGRAMS = [
+    ('skillswap_request_duration_seconds', 'Time spent in the view and middleware', DURATION_BUCKETS),
+    ('skillswap_request_queries', 'SQL statements per request', QUERY_BUCKETS),
+    ('skillswap_request_query_duration_seconds', 'Time spent in SQL per request', DURATION_BUCKETS),
+    ('skillswap_request_template_duration_seconds', 'Time spent rendering templates per request',
+     DURATION_BUCKETS),
+    ('skillswap_response_size_bytes', 'Size of non-streaming response bodies', SIZE_BUCKETS),
+]
+
+_current = contextvars.ContextVar('skillswap_request_stats', default=None)
+
+
+def get_setting(name):
+    return getattr(settings, 'SKILLSWAP_METRICS', {}).get(name, DEFAULTS[name])
+
+
+class RequestStats:
+    """What one request spent, filled in while it runs"""
+
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.statements = []
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.query_time += elapsed
+            if len(self.statements) < get_setting('SLOW_REQUEST_MAX_QUERIES'):
+                self.statements.append((elapsed, sql))
+
+
+def start_request():
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def finish_request(token):
+    _current.reset(token)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {name: {} for name, _, _ in HISTOGRAMS}
+            self.requests = {}
+
+    def observe(self, view, method, status, duration, stats, size=None):
+        values = {
+            'skillswap_request_duration_seconds': duration,
+            'skillswap_request_queries': stats.queries,
+            'skillswap_request_query_duration_seconds': stats.query_time,
+            'skillswap_request_template_duration_seconds': stats.template_time,
+            'skillswap_response_size_bytes': size,
+        }
+        with self._lock:
+            key = (view, method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            for name, _, buckets in HISTOGRAMS:
+                if values[name] is None:
+                    continue
+                series = self.histograms[name]
+                if (view, method) not in series:
+                    series[view, method] = Histogram(buckets)
+                series[view, method].observe(values[name])
+
+    def snapshot(self):
+        with self._lock:
+            requests = dict(self.requests)
+            histograms = {
+                name: {labels: (list(h.counts), h.sum) for labels, h in series.items()}
+                for name, series in self.histograms.items()
+            }
+        return requests, histograms
+
+
+registry = Registry()
+
+
+def _labels(**labels):
+    escaped = (
+        (name, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in labels.items()
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(extra=()):
+    """
+    The registry in Prometheus text exposition format.
+
+    ``extra`` is an iterable of ``(name, type, help, [(labels, value)])``
+    for metrics that are not collected per request.
+    """
+    requests, histograms = registry.snapshot()
+    lines = [
+        '# HELP skillswap_requests_total Requests handled by this process',
+        '# TYPE skillswap_requests_total counter',
+    ]
+    for (view, method, status), count in sorted(requests.items()):
+        lines.append(f'skillswap_requests_total{_labels(view=view, method=method, status=status)} {count}')
+
+    for name, help_text, buckets in HISTOGRAMS:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for (view, method), (counts, total) in sorted(histograms[name].items()):
+            cumulative = 0
+            for bound, count in zip([*buckets, '+Inf'], counts):
+                cumulative += count
+                labels = _labels(view=view, method=method, le=bound)
+                lines.append(f'{name}_bucket{labels} {cumulative}')
+            labels = _labels(view=view, method=method)
+            lines += [f'{name}_sum{labels} {_number(total)}', f'{name}_count{labels} {cumulative}']
+
+    for name, metric_type, help_text, samples in extra:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {metric_type}']
+        lines += [f'{name}{_labels(**labels)} {_number(value)}' for labels, value in samples]
+    return '\n'.join(lines) + '\n'
+
+
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        stats = _current.get()
+        if stats is None:
+            return super().render(context, request)
+        # Templates rendered from inside another one (e.g. by a tag) are
+        # already part of the outer timing
+        stats.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_depth -= 1
+            if not stats.template_depth:
+                stats.template_time += time.perf_counter() - started
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, timing renders for ``MetricsMiddleware``"""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return InstrumentedTemplate(template.template, self)
@@ -0,0 +1,112 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.functional import SimpleLazyObject
+
+from . import metrics, replicas
+from .models import UserProfile
+
+logger = logging.getLogger('skillswap.metrics')
+
+
+class MetricsMiddleware:
+    """
+    Record latency, SQL, template time and response size per URL name.
+
+    Requests slower than ``SKILLSWAP_METRICS['SLOW_REQUEST_MS']`` are logged
+    with their statements. Streaming bodies are produced after the response
+    leaves the middleware, so only the time to the first byte is counted and
+    their size is not observed.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not metrics.get_setting('ENABLED'):
+            return self.get_response(request)
+
+        stats, token = metrics.start_request()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats.record_query))
+                response = self.get_response(request)
+        finally:
+            metrics.finish_request(token)
+        duration = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else '<unresolved>'
+        size = None if response.streaming else len(response.content)
+        metrics.registry.observe(view, request.method, response.status_code, duration, stats, size)
+
+        if duration * 1000 >= metrics.get_setting('SLOW_REQUEST_MS'):
+            self.log_slow_request(request, view, response, duration, stats)
+        return response
+
+    def log_slow_request(self, request, view, response, duration, stats):
+        statements = ''.join(f'\n  {elapsed * 1000:8.1f} ms  {sql}' for elapsed, sql in stats.statements)
+        if stats.queries > len(stats.statements):
+            statements += f'\n  ... {stats.queries - len(stats.statements)} more'
+        logger.warning(
+            'Slow request: %s %s (%s) -> %s in %.0f ms; %s queries in %.0f ms, templates %.0f ms%s',
+            request.method, request.get_full_path(), view, response.status_code, duration * 1000,
+            stats.queries, stats.query_time * 1000, stats.template_time * 1000, statements,
+        )
+
+
+class ReplicaPinningMiddleware:
+    """
+    Let safe requests read from the replicas (see skillswap.replicas), and
+    keep a browser on the primary for a while after one of its requests
+    wrote. Must come before any middleware that writes on the way out, such
+    as SessionMiddleware, so those writes are seen too.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state, token = replicas.start_request(request)
+        try:
+            with connections[DEFAULT_DB_ALIAS].execute_wrapper(state.record_query):
+                response = self.get_response(request)
+        finally:
+            replicas.finish_request(token)
+        if state.wrote:
+            response.set_cookie(
+                replicas.get_setting('COOKIE_NAME'), '1',
+                max_age=replicas.get_setting('STICKY_SECONDS'), httponly=True, samesite='Lax',
+            )
+        return response
+
+
+def get_profile(request):
+    user = request.user
+    if not user.is_authenticated:
+        return None
+    try:
+        # Joined to the user by skillswap.backends.ProfileBackend
+        return user.userprofile
+    except UserProfile.DoesNotExist:
+        # Users saved without signals, e.g. by bulk_create
+        return UserProfile.objects.get_or_create(user=user)[0]
+
+
+class ProfileMiddleware:
+    """
+    Set ``request.profile`` to the signed-in user's ``UserProfile`` (falsy
+    for anonymous users), loaded on first use. Must come after
+    AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.profile = SimpleLazyObject(lambda: get_profile(request))
+        return self.get_response(request)
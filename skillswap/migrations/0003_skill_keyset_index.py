@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skillswap', '0002_message'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['-created_at', '-id'], name='skill_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS skillswap_skill_fts "
+            "USING fts5(name, description, tokenize = 'porter unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            "INSERT INTO skillswap_skill_fts (rowid, name, description) "
+            "SELECT id, name, description FROM skillswap_skill"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute("ALTER TABLE skillswap_skill ADD COLUMN IF NOT EXISTS search_vector tsvector")
+        schema_editor.execute(
+            "UPDATE skillswap_skill SET search_vector = "
+            "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS skill_search_vector_idx "
+            "ON skillswap_skill USING GIN (search_vector)"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS skillswap_skill_fts")
+    elif vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS skill_search_vector_idx")
+        schema_editor.execute("ALTER TABLE skillswap_skill DROP COLUMN IF EXISTS search_vector")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skillswap', '0003_skill_keyset_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:46
+
+from django.db import migrations, models
+from django.db.models import F, Func, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+# Self-contained rather than calling skillswap.counters, which keeps changing
+# after this migration: the counters as they were defined here
+EXCHANGE_COUNTER_FIELDS = {
+    'pending': 'exchanges_pending',
+    'accepted': 'exchanges_accepted',
+    'completed': 'exchanges_completed',
+}
+BATCH_SIZE = 1000
+
+
+def _aggregate(queryset, function, field='pk'):
+    return Coalesce(
+        Subquery(
+            queryset.order_by().annotate(
+                value=Func(F(field), function=function, output_field=models.IntegerField())
+            ).values('value')[:1],
+            output_field=models.IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def backfill_counters(apps, schema_editor):
+    UserProfile = apps.get_model('skillswap', 'UserProfile')
+    SkillExchange = apps.get_model('skillswap', 'SkillExchange')
+    Message = apps.get_model('skillswap', 'Message')
+    Review = apps.get_model('skillswap', 'Review')
+
+    participant = Q(requester=OuterRef('pk')) | Q(provider=OuterRef('pk'))
+    reviews = Review.objects.filter(reviewee=OuterRef('pk'))
+    values = {
+        field: _aggregate(SkillExchange.objects.filter(participant, status=status), 'COUNT')
+        for status, field in EXCHANGE_COUNTER_FIELDS.items()
+    }
+    values['unread_messages'] = _aggregate(Message.objects.filter(receiver=OuterRef('pk'), is_read=False), 'COUNT')
+    values['rating_count'] = _aggregate(reviews, 'COUNT')
+    values['rating_sum'] = _aggregate(reviews, 'SUM', 'rating')
+
+    ids = UserProfile.objects.order_by('pk').values_list('pk', flat=True)
+    last_id = 0
+    while True:
+        batch = list(ids.filter(pk__gt=last_id)[:BATCH_SIZE])
+        if not batch:
+            break
+        UserProfile.objects.filter(pk__gte=batch[0], pk__lte=batch[-1]).update(**values)
+        last_id = batch[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skillswap', '0004_skill_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='exchanges_accepted',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='exchanges_completed',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='exchanges_pending',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='rating_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='rating_sum',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='unread_messages',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
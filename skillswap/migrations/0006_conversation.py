@@ -0,0 +1,87 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:47
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+import django.db.models.deletion
+
+
+SNIPPET_LENGTH = 120
+BATCH_SIZE = 1000
+
+
+def snippet(content):
+    content = ' '.join(content.split())
+    if len(content) > SNIPPET_LENGTH:
+        content = content[:SNIPPET_LENGTH - 3] + '...'
+    return content
+
+
+def backfill_conversations(apps, schema_editor):
+    # Self-contained rather than calling skillswap.conversations, which keeps
+    # changing after this migration
+    Message = apps.get_model('skillswap', 'Message')
+    Conversation = apps.get_model('skillswap', 'Conversation')
+    directed = Message.objects.order_by().values('sender_id', 'receiver_id').annotate(
+        last_id=Max('id'), unread=Count('id', filter=Q(is_read=False))
+    )
+
+    last_ids = {}
+    unread = {}
+    for row in directed.iterator():
+        sender_id, receiver_id = row['sender_id'], row['receiver_id']
+        if sender_id == receiver_id:
+            continue
+        pair = (min(sender_id, receiver_id), max(sender_id, receiver_id))
+        last_ids[pair] = max(last_ids.get(pair, 0), row['last_id'])
+        unread[(receiver_id, sender_id)] = row['unread']
+
+    pairs = list(last_ids.items())
+    for start in range(0, len(pairs), BATCH_SIZE):
+        chunk = pairs[start:start + BATCH_SIZE]
+        messages = Message.objects.in_bulk([last_id for _, last_id in chunk])
+        rows = []
+        for pair, last_id in chunk:
+            message = messages[last_id]
+            for owner_id, partner_id in (pair, pair[::-1]):
+                rows.append(Conversation(
+                    owner_id=owner_id,
+                    partner_id=partner_id,
+                    last_message_id=message.id,
+                    last_message_at=message.created_at,
+                    last_sender_id=message.sender_id,
+                    snippet=snippet(message.content),
+                    unread_count=unread.get((owner_id, partner_id), 0),
+                ))
+        Conversation.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skillswap', '0005_profile_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Conversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_message_at', models.DateTimeField()),
+                ('snippet', models.CharField(blank=True, max_length=120)),
+                ('unread_count', models.IntegerField(default=0)),
+                ('last_message', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='skillswap.message')),
+                ('last_sender', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='skillswap.userprofile')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversations', to='skillswap.userprofile')),
+                ('partner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='skillswap.userprofile')),
+            ],
+            options={
+                'ordering': ['-last_message_at'],
+                'indexes': [models.Index(fields=['owner', '-last_message_at', '-id'], name='conversation_inbox_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='conversation',
+            constraint=models.UniqueConstraint(fields=('owner', 'partner'), name='conversation_owner_partner_uniq'),
+        ),
+        migrations.RunPython(backfill_conversations, migrations.RunPython.noop),
+    ]
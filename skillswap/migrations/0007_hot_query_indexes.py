@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skillswap', '0006_conversation'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='message',
+            name='sender',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='messages_sent', to='skillswap.userprofile'),
+        ),
+        migrations.AlterField(
+            model_name='skillexchange',
+            name='provider',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='exchanges_provided', to='skillswap.userprofile'),
+        ),
+        migrations.AlterField(
+            model_name='skillexchange',
+            name='requester',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='exchanges_requested', to='skillswap.userprofile'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['sender', 'receiver', 'id'], name='message_pair_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['receiver', 'sender'], name='message_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['category', '-created_at', '-id'], name='skill_category_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skillexchange',
+            index=models.Index(fields=['requester', 'status', '-created_at'], name='exchange_requester_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skillexchange',
+            index=models.Index(fields=['provider', 'status', '-created_at'], name='exchange_provider_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+from django.db import migrations, models
+from django.db.models import F, Func, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 1000
+
+
+def _aggregate(queryset, function, field, output_field):
+    return Coalesce(
+        Subquery(
+            queryset.order_by().annotate(
+                value=Func(F(field), function=function, output_field=output_field)
+            ).values('value')[:1],
+            output_field=output_field,
+        ),
+        Value(0, output_field=output_field),
+    )
+
+
+def backfill_ratings(apps, schema_editor):
+    # Self-contained rather than calling skillswap.counters, which keeps
+    # changing after this migration
+    UserProfile = apps.get_model('skillswap', 'UserProfile')
+    Review = apps.get_model('skillswap', 'Review')
+
+    # Derive rating from the reviews for every existing profile, together
+    # with the rating_count and rating_sum it is maintained from
+    reviews = Review.objects.filter(reviewee=OuterRef('pk'))
+    values = {
+        'rating_count': _aggregate(reviews, 'COUNT', 'pk', models.IntegerField()),
+        'rating_sum': _aggregate(reviews, 'SUM', 'rating', models.IntegerField()),
+        'rating': _aggregate(reviews, 'AVG', 'rating', models.FloatField()),
+    }
+    ids = UserProfile.objects.order_by('pk').values_list('pk', flat=True)
+    last_id = 0
+    while True:
+        batch = list(ids.filter(pk__gt=last_id)[:BATCH_SIZE])
+        if not batch:
+            break
+        UserProfile.objects.filter(pk__gte=batch[0], pk__lte=batch[-1]).update(**values)
+        last_id = batch[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skillswap', '0007_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:53
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+BATCH_SIZE = 1000
+
+
+def backfill_offers(apps, schema_editor):
+    # Self-contained rather than calling skillswap.recommendations, which
+    # keeps changing after this migration
+    Skill = apps.get_model('skillswap', 'Skill')
+    SkillOffer = apps.get_model('skillswap', 'SkillOffer')
+    rows = (
+        Skill.objects.order_by().values('owner_id', 'category', 'level')
+        .annotate(count=Count('id')).iterator()
+    )
+    batch = []
+    for row in rows:
+        batch.append(SkillOffer(profile_id=row['owner_id'], category=row['category'],
+                                level=row['level'], skill_count=row['count']))
+        if len(batch) >= BATCH_SIZE:
+            SkillOffer.objects.bulk_create(batch)
+            batch = []
+    SkillOffer.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skillswap', '0008_backfill_ratings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillOffer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(choices=[('programming', 'Programming'), ('languages', 'Languages'), ('design', 'Design'), ('business', 'Business'), ('music', 'Music'), ('sports', 'Sports'), ('cooking', 'Cooking'), ('art', 'Art'), ('fitness', 'Fitness'), ('other', 'Other')], max_length=50)),
+                ('level', models.CharField(choices=[('beginner', 'Beginner'), ('intermediate', 'Intermediate'), ('advanced', 'Advanced'), ('expert', 'Expert')], max_length=20)),
+                ('skill_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('profile', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='skill_offers', to='skillswap.userprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['category', '-updated_at'], name='skill_offer_lookup_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='skilloffer',
+            constraint=models.UniqueConstraint(fields=('profile', 'category', 'level'), name='skill_offer_uniq'),
+        ),
+        migrations.RunPython(backfill_offers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skillswap', '0009_skill_offer_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skill',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='profile_picture_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
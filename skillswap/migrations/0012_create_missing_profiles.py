@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def create_missing_profiles(apps, schema_editor):
+    # Profiles used to be created on first visit; now every user gets one when
+    # saved (skillswap.signals), so create them for users who never visited
+    User = apps.get_model('auth', 'User')
+    UserProfile = apps.get_model('skillswap', 'UserProfile')
+    missing = User.objects.filter(userprofile__isnull=True).values_list('pk', flat=True)
+    UserProfile.objects.bulk_create([UserProfile(user_id=user_id) for user_id in missing.iterator()], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('skillswap', '0011_task_queue'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_profiles, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-18 20:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skillswap', '0013_exchange_events'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedMessage',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('content', models.TextField()),
+                ('is_read', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField()),
+                ('exchange', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='skillswap.skillexchange')),
+                ('receiver', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='skillswap.userprofile')),
+                ('sender', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='skillswap.userprofile')),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['sender', 'receiver', 'id'], name='archived_message_pair_idx')],
+            },
+        ),
+    ]
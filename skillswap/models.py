@@ -1,19 +1,46 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     bio = models.TextField(blank=True, null=True)
     profile_picture = models.ImageField(upload_to='profile_pics/', blank=True, null=True)
+    # Resized copies of profile_picture, written by skillswap.images
+    profile_picture_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     location = models.CharField(max_length=100, blank=True)
     rating = models.FloatField(default=0, validators=[MinValueValidator(0), MaxValueValidator(5)])
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Denormalized counters, maintained by skillswap.counters (rating is rating_sum / rating_count)
+    exchanges_pending = models.IntegerField(default=0, editable=False)
+    exchanges_accepted = models.IntegerField(default=0, editable=False)
+    exchanges_completed = models.IntegerField(default=0, editable=False)
+    unread_messages = models.IntegerField(default=0, editable=False)
+    rating_count = models.IntegerField(default=0, editable=False)
+    rating_sum = models.IntegerField(default=0, editable=False)
+
+    DENORMALIZED_FIELDS = (
+        'exchanges_pending', 'exchanges_accepted', 'exchanges_completed',
+        'unread_messages', 'rating_count', 'rating_sum', 'rating',
+        'profile_picture_derivatives',
+    )
+
     def __str__(self):
         return f"{self.user.username}'s profile"
 
+    def save(self, *args, **kwargs):
+        # Counters, rating and image derivatives are only ever changed with
+        # update(); a full-row save of a stale instance must not write them back
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.DENORMALIZED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['-created_at']
 
@@ -45,6 +72,8 @@ class Skill(models.Model):
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES)
     level = models.CharField(max_length=20, choices=LEVEL_CHOICES)
     image = models.ImageField(upload_to='skill_images/', blank=True, null=True)
+    # Resized copies of image, written by skillswap.images
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -53,6 +82,37 @@ class Skill(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination in browse_skills walks (created_at, id) newest-first
+            models.Index(fields=['-created_at', '-id'], name='skill_created_id_idx'),
+            # ... and the same walk within one category
+            models.Index(fields=['category', '-created_at', '-id'], name='skill_category_created_idx'),
+        ]
+
+
+class SkillOffer(models.Model):
+    """
+    Inverted index of who offers what: one row per (profile, category, level).
+
+    Maintained by skillswap.recommendations from Skill signals so swap
+    suggestions are index range scans instead of joins over every skill.
+    """
+    profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='skill_offers', db_index=False)
+    category = models.CharField(max_length=50, choices=Skill.CATEGORY_CHOICES)
+    level = models.CharField(max_length=20, choices=Skill.LEVEL_CHOICES)
+    skill_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.profile_id}: {self.category}/{self.level}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['profile', 'category', 'level'], name='skill_offer_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['category', '-updated_at'], name='skill_offer_lookup_idx'),
+        ]
 
 
 class SkillExchange(models.Model):
@@ -64,10 +124,16 @@ class SkillExchange(models.Model):
         ('cancelled', 'Cancelled'),
     ]
 
+    # Status -> statuses it may move to, applied by skillswap.exchanges.transition
+    TRANSITIONS = {
+        'pending': {'accepted', 'rejected', 'cancelled'},
+        'accepted': {'completed'},
+    }
+
     skill_offered = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='exchanges_offered')
     skill_requested = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='exchanges_requested')
-    requester = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='exchanges_requested')
-    provider = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='exchanges_provided')
+    requester = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='exchanges_requested', db_index=False)
+    provider = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='exchanges_provided', db_index=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     message = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -78,10 +144,30 @@ class SkillExchange(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Each side of the requester/provider OR in the dashboard, by status
+            models.Index(fields=['requester', 'status', '-created_at'], name='exchange_requester_idx'),
+            models.Index(fields=['provider', 'status', '-created_at'], name='exchange_provider_idx'),
+        ]
+
+
+class ExchangeEvent(models.Model):
+    """A status change of an exchange, written by the transition that won it"""
+    exchange = models.ForeignKey(SkillExchange, on_delete=models.CASCADE, related_name='events')
+    from_status = models.CharField(max_length=20, choices=SkillExchange.STATUS_CHOICES)
+    to_status = models.CharField(max_length=20, choices=SkillExchange.STATUS_CHOICES)
+    actor = models.ForeignKey(UserProfile, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"#{self.exchange_id}: {self.from_status} -> {self.to_status}"
+
+    class Meta:
+        ordering = ['created_at', 'id']
 
 
 class Message(models.Model):
-    sender = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='messages_sent')
+    sender = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='messages_sent', db_index=False)
     receiver = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='messages_received')
     exchange = models.ForeignKey(SkillExchange, on_delete=models.CASCADE, related_name='messages', null=True, blank=True)
     content = models.TextField()
@@ -93,6 +179,66 @@ class Message(models.Model):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # Each side of a conversation read, walked by id (windows, since-id, before-id)
+            models.Index(fields=['sender', 'receiver', 'id'], name='message_pair_idx'),
+            # Only unread rows, so mark-read and unread counts stay cheap
+            models.Index(
+                fields=['receiver', 'sender'], condition=models.Q(is_read=False), name='message_unread_idx',
+            ),
+        ]
+
+
+class ArchivedMessage(models.Model):
+    """
+    A read ``Message`` older than the hot window, moved here by
+    ``manage.py archive_messages`` with its id unchanged (see skillswap.archive).
+    """
+    id = models.BigIntegerField(primary_key=True)
+    sender = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='+', db_index=False)
+    receiver = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='+')
+    exchange = models.ForeignKey(SkillExchange, on_delete=models.CASCADE, related_name='+', null=True, blank=True)
+    content = models.TextField()
+    is_read = models.BooleanField(default=True)
+    created_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.sender.user.username} -> {self.receiver.user.username}: {self.content[:50]}"
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            # Scrolling back through a conversation, as on Message
+            models.Index(fields=['sender', 'receiver', 'id'], name='archived_message_pair_idx'),
+        ]
+
+
+class Conversation(models.Model):
+    """
+    Inbox summary of the messages between ``owner`` and ``partner``.
+
+    Each pair of users has two rows, one per participant, so an inbox is a
+    single index range scan on (owner, last_message_at).
+    """
+    owner = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='conversations')
+    partner = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='+')
+    last_message = models.ForeignKey(Message, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    last_message_at = models.DateTimeField()
+    last_sender = models.ForeignKey(UserProfile, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    snippet = models.CharField(max_length=120, blank=True)
+    unread_count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.owner.user.username} <-> {self.partner.user.username}"
+
+    class Meta:
+        ordering = ['-last_message_at']
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'partner'], name='conversation_owner_partner_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['owner', '-last_message_at', '-id'], name='conversation_inbox_idx'),
+        ]
 
 
 class Review(models.Model):
@@ -109,3 +255,48 @@ class Review(models.Model):
     class Meta:
         ordering = ['-created_at']
         unique_together = ('reviewer', 'reviewee', 'exchange')
+
+
+class Task(models.Model):
+    """
+    A deferred call waiting in the database queue (see ``skillswap.tasks``).
+
+    Rows are deleted once they succeed; ``locked_by``/``locked_until`` form a
+    lease, so a task whose worker died becomes claimable again on expiry.
+    """
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} (attempt {self.attempts}/{self.max_attempts})"
+
+    class Meta:
+        ordering = ['run_at', 'id']
+        indexes = [
+            models.Index(fields=['run_at', 'id'], name='task_ready_idx'),
+        ]
+
+
+class DeadTask(models.Model):
+    """A task that failed ``max_attempts`` times, kept for inspection and requeueing"""
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+    failed_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} (failed {self.failed_at:%Y-%m-%d %H:%M})"
+
+    class Meta:
+        ordering = ['-failed_at']
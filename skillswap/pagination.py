@@ -0,0 +1,104 @@
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(value, pk):
+    """Encode a (sort value, id) position as an opaque URL-safe token"""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, pk]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Decode a token produced by encode_cursor back into (sort value, id)"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        elif not isinstance(value, (int, float)):
+            raise TypeError(value)
+        return value, int(pk)
+    except (ValueError, TypeError):
+        raise InvalidCursor(token)
+
+
+class KeysetPage:
+    """One page of results plus the cursors to reach its neighbours"""
+
+    def __init__(self, object_list, next_cursor=None, prev_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.prev_cursor is not None
+
+
+class KeysetPaginator:
+    """
+    Paginate descending on (key, id), newest-first on created_at by default.
+
+    Unlike OFFSET pagination, a cursor pins the position to a concrete row,
+    so rows inserted while a user is paging never shift or duplicate items,
+    and every page is an index range scan no matter how deep it is.
+    """
+
+    def __init__(self, queryset, per_page=24, key='created_at'):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.key = key
+
+    def page(self, after=None, before=None):
+        """Return the page after or before the given cursor, or the first page"""
+        if before:
+            value, pk = decode_cursor(before)
+            rows = list(
+                self.queryset.filter(
+                    Q(**{f'{self.key}__gt': value}) | Q(**{self.key: value, 'id__gt': pk})
+                ).order_by(self.key, 'id')[:self.per_page + 1]
+            )
+            if rows:
+                has_more = len(rows) > self.per_page
+                rows = rows[:self.per_page][::-1]
+                return self._build(rows, has_newer=has_more, has_older=True)
+            # Nothing newer left (e.g. rows were deleted); fall back to the first page
+
+        qs = self.queryset.order_by(f'-{self.key}', '-id')
+        if after:
+            value, pk = decode_cursor(after)
+            qs = qs.filter(Q(**{f'{self.key}__lt': value}) | Q(**{self.key: value, 'id__lt': pk}))
+        rows = list(qs[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        return self._build(rows, has_newer=bool(after), has_older=has_more)
+
+    def _build(self, rows, has_newer, has_older):
+        next_cursor = prev_cursor = None
+        if rows and has_older:
+            next_cursor = encode_cursor(getattr(rows[-1], self.key), rows[-1].id)
+        if rows and has_newer:
+            prev_cursor = encode_cursor(getattr(rows[0], self.key), rows[0].id)
+        return KeysetPage(rows, next_cursor=next_cursor, prev_cursor=prev_cursor)
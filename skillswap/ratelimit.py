@@ -0,0 +1,171 @@
+"""
+Token-bucket rate limits for expensive or abusable views.
+
+Each limited view has buckets per client IP and, where configured, per
+signed-in user or per username submitted to the login form from one IP
+(counting usernames alone would let anyone lock a user out of their account
+by failing to log in as them). A bucket holds up to N tokens and refills at
+N per period; every request spends one token from each of its buckets, and
+a request finding any bucket empty gets a 429 response whose
+``Retry-After`` says when a token will be back.
+
+Buckets live in the default cache as ``(tokens, updated at)`` pairs, so they
+work with the local-memory cache of a single process and are shared between
+workers through Redis. Updates are serialised within a process; across
+processes two concurrent requests can spend the same token, which makes the
+limit approximate by at most the number of workers. With the local-memory
+cache every process keeps its own buckets; ``manage.py check --deploy``
+warns about that and about a missing ``IP_HEADER``.
+
+Limits are set per URL name in ``SKILLSWAP_RATELIMIT['LIMITS']`` as rates
+like ``'10/m'``; ``rate_limit()`` applies them to a view.
+"""
+
+import hashlib
+import logging
+import math
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.shortcuts import render
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    # {url name: {scope: 'N/period'}}; scopes are 'ip', 'user' (the signed-in
+    # user) and 'username' (the username field of the submitted form, per IP)
+    'LIMITS': {
+        'login': {'ip': '20/m', 'username': '5/m'},
+        'register': {'ip': '5/h'},
+        'chat_view': {'ip': '60/m', 'user': '20/m'},
+        'exchange_chat': {'ip': '60/m', 'user': '20/m'},
+    },
+    # Request header carrying the client IP when behind a proxy, e.g.
+    # 'X-Forwarded-For'; its last address (the one added by the proxy) is used
+    'IP_HEADER': '',
+}
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+_lock = threading.Lock()
+
+
+def get_setting(name):
+    return getattr(settings, 'SKILLSWAP_RATELIMIT', {}).get(name, DEFAULTS[name])
+
+
+@checks.register(checks.Tags.security, deploy=True)
+def check_deployment(app_configs, **kwargs):
+    if not get_setting('ENABLED'):
+        return []
+    warnings = []
+    if not get_setting('IP_HEADER'):
+        warnings.append(checks.Warning(
+            "SKILLSWAP_RATELIMIT['IP_HEADER'] is not set, so rate limits count REMOTE_ADDR.",
+            hint='Behind a proxy every client shares its address: set RATELIMIT_IP_HEADER, '
+                 'e.g. to X-Forwarded-For.',
+            id='skillswap.W001',
+        ))
+    if settings.CACHES['default']['BACKEND'] == 'django.core.cache.backends.locmem.LocMemCache':
+        warnings.append(checks.Warning(
+            'Rate limit buckets are kept in per-process memory.',
+            hint='Each process or instance then allows the full rate: set CACHE_URL to a shared Redis.',
+            id='skillswap.W002',
+        ))
+    return warnings
+
+
+def parse_rate(rate):
+    """``'10/m'`` -> ``(10, 60.0)``: bucket size and seconds to refill it"""
+    try:
+        count, period = rate.split('/')
+        return int(count), float(PERIODS[period])
+    except (KeyError, ValueError):
+        raise ImproperlyConfigured(f'Invalid rate {rate!r}; expected e.g. "10/m" with s, m, h or d')
+
+
+def client_ip(request):
+    header = get_setting('IP_HEADER')
+    if header:
+        forwarded = request.headers.get(header, '')
+        if forwarded:
+            return forwarded.split(',')[-1].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _identity(request, scope):
+    """Who ``scope`` counts for this request, or None if it does not apply"""
+    if scope == 'ip':
+        return client_ip(request) or None
+    if scope == 'user':
+        return request.user.pk if request.user.is_authenticated else None
+    if scope == 'username':
+        username = request.POST.get('username', '').strip().lower()
+        return f'{username}@{client_ip(request)}' if username else None
+    raise ImproperlyConfigured(f'Unknown rate limit scope {scope!r}')
+
+
+def bucket_key(name, scope, identity):
+    digest = hashlib.md5(str(identity).encode()).hexdigest()
+    return f'skillswap:ratelimit:{name}:{scope}:{digest}'
+
+
+def take(key, capacity, period, now=None):
+    """
+    Spend a token from the bucket at ``key``. Returns 0 if there was one,
+    otherwise the seconds until there will be.
+    """
+    now = time.time() if now is None else now
+    rate = capacity / period
+    with _lock:
+        tokens, updated_at = cache.get(key) or (capacity, now)
+        tokens = min(capacity, tokens + (now - updated_at) * rate)
+        if tokens < 1:
+            return (1 - tokens) / rate
+        # Kept until the bucket would be full again anyway
+        cache.set(key, (tokens - 1, now), math.ceil(period))
+    return 0
+
+
+def check(request, name):
+    """Seconds the request must wait under the limits of URL name ``name``, or 0"""
+    if not get_setting('ENABLED'):
+        return 0
+    wait = 0
+    for scope, rate in get_setting('LIMITS').get(name, {}).items():
+        identity = _identity(request, scope)
+        if identity is None:
+            continue
+        capacity, period = parse_rate(rate)
+        wait = max(wait, take(bucket_key(name, scope, identity), capacity, period))
+    return wait
+
+
+def rate_limit(name=None, methods=('POST',)):
+    """
+    Limit ``methods`` requests to the view by the limits of its URL name, or
+    of ``name`` when given, answering 429 with ``Retry-After`` once a bucket
+    is empty.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method in methods:
+                limit_name = name or request.resolver_match.url_name
+                wait = check(request, limit_name)
+                if wait:
+                    retry_after = max(1, math.ceil(wait))
+                    logger.info('Rate limited %s for %s (%ss)', limit_name, client_ip(request), retry_after)
+                    response = render(request, 'skillswap/rate_limited.html',
+                                      {'retry_after': retry_after}, status=429)
+                    response['Retry-After'] = str(retry_after)
+                    return response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
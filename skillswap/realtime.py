@@ -0,0 +1,34 @@
+"""
+Live chat events.
+
+Every saved ``Message`` is published, once its transaction commits, on the
+broker channel of the conversation it belongs to. The SSE views in
+``skillswap.views`` subscribe to that channel, so connected clients receive
+new messages without polling the database.
+"""
+
+from django.db import transaction
+
+from .broker import get_broker
+
+
+def conversation_channel(profile_id, other_profile_id):
+    low, high = sorted((profile_id, other_profile_id))
+    return f'skillswap:chat:{low}:{high}'
+
+
+def message_payload(message):
+    return {
+        'id': message.id,
+        'sender_id': message.sender_id,
+        'receiver_id': message.receiver_id,
+        'content': message.content,
+        'created_at': message.created_at.isoformat(),
+    }
+
+
+def publish_message(message):
+    """Push ``message`` to the conversation's subscribers after commit"""
+    channel = conversation_channel(message.sender_id, message.receiver_id)
+    payload = message_payload(message)
+    transaction.on_commit(lambda: get_broker().publish(channel, payload))
@@ -0,0 +1,135 @@
+"""
+Reciprocal swap suggestions.
+
+A good counterpart offers a category (or a higher level in it) that I lack
+*and* lacks one that I offer. ``SkillOffer`` is an inverted index from
+(category, level) to the profiles offering it, refreshed per owner and
+category whenever a ``Skill`` is saved or deleted. A suggestion request reads
+the requester's own offers, takes the most recently active offerers of each
+category they have not mastered from the index, and scores that bounded
+candidate set; no query touches the whole skill or profile table. Results
+are cached per profile for a few minutes.
+"""
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Skill, SkillOffer, UserProfile
+
+LEVEL_RANK = {level: rank for rank, (level, _) in enumerate(Skill.LEVEL_CHOICES, start=1)}
+
+# Most recently active offerers pulled from the index per category
+CANDIDATES_PER_CATEGORY = 50
+
+# Suggestions are recomputed at most this often per profile
+SUGGESTIONS_TIMEOUT = 300
+
+
+def refresh_offers(profile_id, categories):
+    """Rebuild the index rows of one profile for the given categories"""
+    categories = set(categories)
+    counts = {
+        (row['category'], row['level']): row['count']
+        for row in Skill.objects.filter(owner_id=profile_id, category__in=categories)
+        .order_by().values('category', 'level').annotate(count=Count('id'))
+    }
+    existing = SkillOffer.objects.filter(profile_id=profile_id, category__in=categories)
+    stale = [offer.pk for offer in existing if (offer.category, offer.level) not in counts]
+    if stale:
+        SkillOffer.objects.filter(pk__in=stale).delete()
+    for (category, level), count in counts.items():
+        SkillOffer.objects.update_or_create(
+            profile_id=profile_id, category=category, level=level,
+            defaults={'skill_count': count},
+        )
+
+
+def rebuild_offers(batch_size=1000):
+    """Recreate the whole index from the skill table"""
+    SkillOffer.objects.all().delete()
+    rows = (
+        Skill.objects.order_by().values('owner_id', 'category', 'level')
+        .annotate(count=Count('id')).iterator()
+    )
+    batch = []
+    written = 0
+    for row in rows:
+        batch.append(SkillOffer(profile_id=row['owner_id'], category=row['category'],
+                                level=row['level'], skill_count=row['count']))
+        if len(batch) >= batch_size:
+            SkillOffer.objects.bulk_create(batch)
+            written += len(batch)
+            batch = []
+    SkillOffer.objects.bulk_create(batch)
+    return written + len(batch)
+
+
+def best_levels(offers):
+    """Map category -> highest level rank from an iterable of (category, level)"""
+    levels = {}
+    for category, level in offers:
+        levels[category] = max(levels.get(category, 0), LEVEL_RANK.get(level, 0))
+    return levels
+
+
+def suggested_swaps(profile, limit=6):
+    """
+    Profiles to swap with, best first, as a list of dicts with the
+    categories each side could teach the other.
+    """
+    key = f'skillswap:swaps:{profile.id}:{limit}'
+    scored = cache.get(key)
+    if scored is None:
+        scored = _score_candidates(profile, limit)
+        cache.set(key, scored, SUGGESTIONS_TIMEOUT)
+    if not scored:
+        return []
+
+    profiles = UserProfile.objects.select_related('user').in_bulk([row[0] for row in scored])
+    labels = dict(Skill.CATEGORY_CHOICES)
+    return [
+        {
+            'profile': profiles[profile_id],
+            'they_teach': [labels[c] for c in they_teach],
+            'i_teach': [labels[c] for c in i_teach],
+        }
+        for profile_id, they_teach, i_teach in scored
+        if profile_id in profiles
+    ]
+
+
+def _score_candidates(profile, limit):
+    """Top ``limit`` (profile_id, they_teach, i_teach) tuples for ``profile``"""
+    mine = best_levels(SkillOffer.objects.filter(profile=profile).values_list('category', 'level'))
+    if not mine:
+        return []
+
+    # Recent offerers of every category I have not mastered; one top-K index scan each
+    top_rank = max(LEVEL_RANK.values())
+    candidates = set()
+    for category, _ in Skill.CATEGORY_CHOICES:
+        if mine.get(category, 0) >= top_rank:
+            continue
+        candidates.update(
+            SkillOffer.objects.filter(category=category).exclude(profile=profile)
+            .order_by('-updated_at').values_list('profile_id', flat=True)[:CANDIDATES_PER_CATEGORY]
+        )
+    if not candidates:
+        return []
+
+    theirs = {}
+    for profile_id, category, level in SkillOffer.objects.filter(profile_id__in=candidates).values_list(
+        'profile_id', 'category', 'level'
+    ):
+        theirs.setdefault(profile_id, []).append((category, level))
+
+    scored = []
+    for profile_id, offers in theirs.items():
+        their_levels = best_levels(offers)
+        they_teach = sorted(c for c, rank in their_levels.items() if rank > mine.get(c, 0))
+        i_teach = sorted(c for c, rank in mine.items() if rank > their_levels.get(c, 0))
+        if they_teach and i_teach:
+            scored.append((min(len(they_teach), len(i_teach)), len(they_teach) + len(i_teach),
+                           profile_id, they_teach, i_teach))
+    scored.sort(reverse=True)
+    return [(profile_id, they_teach, i_teach) for _, _, profile_id, they_teach, i_teach in scored[:limit]]
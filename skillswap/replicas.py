@@ -0,0 +1,102 @@
+"""
+Read replicas for the queries made while serving a request.
+
+``PrimaryReplicaRouter`` sends reads to one of the replica aliases and every
+write, migration and transaction to ``default``. Replicas lag behind the
+primary, so reads stay on the primary:
+
+* outside a request (management commands, the task worker, the shell);
+* for the whole of a request with an unsafe method (POST, ...), and for the
+  rest of any other request once it has written or locked rows;
+* inside ``transaction.atomic`` on the primary;
+* for sessions, which are read on every request right after being written,
+  and whose absence on a lagging replica would log the user out;
+* for ``SKILLSWAP_REPLICAS['STICKY_SECONDS']`` after a browser's request
+  wrote, through a cookie set by ``ReplicaPinningMiddleware``
+  (skillswap.middleware), so users read their own writes.
+
+Configured with ``SKILLSWAP_REPLICAS``; ``manage.py sync_replica`` copies a
+SQLite primary into a SQLite replica to try it locally with a chosen lag.
+"""
+
+import contextvars
+import random
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+DEFAULTS = {
+    # Database aliases that reads may go to
+    'ALIASES': [],
+    # How long a browser keeps reading from the primary after it wrote
+    'STICKY_SECONDS': 10,
+    'COOKIE_NAME': 'replica_pin',
+}
+
+# Safe methods, as in django.middleware.csrf
+SAFE_METHODS = {'GET', 'HEAD', 'OPTIONS', 'TRACE'}
+
+# Apps whose models are always read from the primary
+PRIMARY_APPS = {'sessions'}
+
+_current = contextvars.ContextVar('skillswap_replica_request', default=None)
+
+
+def get_setting(name):
+    return getattr(settings, 'SKILLSWAP_REPLICAS', {}).get(name, DEFAULTS[name])
+
+
+# Leading keywords of the statements that change data
+WRITE_KEYWORDS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+class RequestState:
+    """Whether the current request may read from a replica, and whether it wrote"""
+
+    def __init__(self, pinned):
+        self.pinned = pinned
+        self.wrote = False
+
+    def record_query(self, execute, sql, params, many, context):
+        """``execute_wrapper`` for the primary noting statements that write"""
+        if not self.wrote and sql.lstrip()[:7].upper().startswith(WRITE_KEYWORDS):
+            self.pinned = self.wrote = True
+        return execute(sql, params, many, context)
+
+
+def start_request(request):
+    pinned = request.method not in SAFE_METHODS or get_setting('COOKIE_NAME') in request.COOKIES
+    state = RequestState(pinned)
+    return state, _current.set(state)
+
+
+def finish_request(token):
+    _current.reset(token)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _current.get()
+        aliases = get_setting('ALIASES')
+        if (
+            state is None or state.pinned or not aliases
+            or model._meta.app_label in PRIMARY_APPS
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(aliases)
+
+    def db_for_write(self, model, **hints):
+        # Also asked for reads that precede a write (select_for_update(),
+        # get_or_create()); what follows them must see the primary too
+        state = _current.get()
+        if state is not None:
+            state.pinned = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,163 @@
+"""
+Full-text search over skills.
+
+SQLite keeps a separate FTS5 table (porter stemming, rowid = skill id) and
+PostgreSQL keeps a weighted ``tsvector`` column on ``skillswap_skill`` with a
+GIN index. Both are created by migration 0004 and kept in sync from the
+``Skill`` signals in ``skillswap.signals``. Any other backend falls back to
+the old ``icontains`` scan.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'skillswap_skill_fts'
+
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def search_terms(query):
+    """Split user input into plain word terms, dropping any query syntax"""
+    return TERM_RE.findall(query.lower())[:10]
+
+
+class SQLiteSearchBackend:
+    """FTS5 virtual table ranked with bm25 (name weighted over description)"""
+
+    def match_expression(self, terms):
+        # Every term is a quoted prefix query; FTS5 stems it with the porter tokenizer
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def search(self, queryset, terms):
+        match = self.match_expression(terms)
+        return queryset.filter(
+            id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+        ).annotate(
+            search_rank=RawSQL(
+                f'SELECT -bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s AND rowid = skillswap_skill.id',
+                [match],
+            )
+        )
+
+    def index(self, skills):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [(skill.id,) for skill in skills],
+            )
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, name, description) VALUES (%s, %s, %s)',
+                [(skill.id, skill.name, skill.description) for skill in skills],
+            )
+
+    def remove(self, skill_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [(skill_id,) for skill_id in skill_ids],
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+
+
+class PostgresSearchBackend:
+    """Weighted tsvector column with a GIN index, ranked with ts_rank_cd"""
+
+    VECTOR_SQL = (
+        "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+    )
+
+    def match_expression(self, terms):
+        return ' & '.join(f'{term}:*' for term in terms)
+
+    def search(self, queryset, terms):
+        match = self.match_expression(terms)
+        return queryset.extra(
+            where=["skillswap_skill.search_vector @@ to_tsquery('english', %s)"],
+            params=[match],
+        ).annotate(
+            # float8 so the rank round-trips exactly through pagination cursors
+            search_rank=RawSQL(
+                "ts_rank_cd(skillswap_skill.search_vector, to_tsquery('english', %s))::float8",
+                [match],
+            )
+        )
+
+    def index(self, skills):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE skillswap_skill SET search_vector = {self.VECTOR_SQL} WHERE id = ANY(%s)',
+                [[skill.id for skill in skills]],
+            )
+
+    def remove(self, skill_ids):
+        # The vector lives on the skill row itself and is deleted with it
+        pass
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute('UPDATE skillswap_skill SET search_vector = NULL')
+
+
+class LikeSearchBackend:
+    """Fallback for databases without a full-text index"""
+
+    def search(self, queryset, terms):
+        for term in terms:
+            queryset = queryset.filter(Q(name__icontains=term) | Q(description__icontains=term))
+        return queryset
+
+    def index(self, skills):
+        pass
+
+    def remove(self, skill_ids):
+        pass
+
+    def clear(self):
+        pass
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_backend():
+    return BACKENDS.get(connection.vendor, LikeSearchBackend)()
+
+
+def is_ranked():
+    """Whether search results carry a ``search_rank`` annotation"""
+    return connection.vendor in BACKENDS
+
+
+def search_skills(queryset, query):
+    """Filter a Skill queryset to matches for ``query``, annotated with ``search_rank``"""
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+    return get_backend().search(queryset, terms)
+
+
+def index_skills(skills):
+    skills = list(skills)
+    if skills:
+        get_backend().index(skills)
+
+
+def remove_skills(skill_ids):
+    skill_ids = list(skill_ids)
+    if skill_ids:
+        get_backend().remove(skill_ids)
+
+
+def clear_index():
+    get_backend().clear()
@@ -0,0 +1,216 @@
+"""
+Synthetic data at production scale.
+
+``seed`` bulk-creates users, profiles, skills, exchanges, reviews and
+message threads with skewed, realistic distributions, then rebuilds every
+piece of derived data (counters, inbox summaries, the search and swap
+indexes) that the per-row signal handlers would normally maintain, since
+``bulk_create`` sends no signals. Backs the ``seed`` and
+``benchmark_queries`` management commands.
+"""
+
+import itertools
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection
+from django.utils import timezone
+
+from . import search
+from .cache import bump_generation, invalidate_admin_stats
+from .conversations import rebuild_conversations
+from .counters import recompute_counters
+from .models import Message, Review, Skill, SkillExchange, UserProfile
+from .recommendations import rebuild_offers
+
+CATEGORY_WEIGHTS = {
+    'programming': 20, 'languages': 15, 'design': 12, 'business': 10, 'music': 10,
+    'sports': 8, 'cooking': 8, 'art': 7, 'fitness': 6, 'other': 4,
+}
+LEVEL_WEIGHTS = {'beginner': 35, 'intermediate': 35, 'advanced': 20, 'expert': 10}
+STATUS_WEIGHTS = {'pending': 25, 'accepted': 20, 'completed': 40, 'rejected': 10, 'cancelled': 5}
+RATING_WEIGHTS = {1: 3, 2: 5, 3: 12, 4: 35, 5: 45}
+
+SKILL_NAMES = {
+    'programming': ['Python', 'JavaScript', 'SQL', 'Rust', 'Django', 'React'],
+    'languages': ['Spanish', 'French', 'Japanese', 'German', 'Mandarin', 'Arabic'],
+    'design': ['Figma', 'Logo Design', 'Typography', 'UX Research', 'Illustration'],
+    'business': ['Bookkeeping', 'Public Speaking', 'Marketing', 'Negotiation'],
+    'music': ['Guitar', 'Piano', 'Singing', 'Music Production', 'Drums'],
+    'sports': ['Tennis', 'Climbing', 'Swimming', 'Football', 'Chess'],
+    'cooking': ['Baking', 'Sourdough', 'Thai Cooking', 'Knife Skills'],
+    'art': ['Watercolour', 'Photography', 'Pottery', 'Sketching'],
+    'fitness': ['Yoga', 'Strength Training', 'Running', 'Pilates'],
+    'other': ['Gardening', 'Woodworking', 'Knitting', 'Home Repair'],
+}
+MESSAGE_TEXTS = [
+    'Hi! Are you free this week?',
+    'Thanks, that session was really helpful.',
+    'Could we move our meeting to Thursday?',
+    'I shared some notes for next time.',
+    'Sounds good, see you then!',
+    'How did the practice go?',
+    'Let me know which topics you want to cover.',
+]
+
+# Message threads follow a power law: a few pairs carry most of the traffic
+THREAD_SKEW = 1.1
+
+# Seeded messages are spread evenly over this many days up to now
+MESSAGE_HISTORY_DAYS = 180
+
+
+def _weighted(rng, weights, k):
+    return rng.choices(list(weights), weights=list(weights.values()), k=k)
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def _insert_rows(model, field_names, rows):
+    """
+    INSERT plain tuples with multi-row VALUES statements.
+
+    Used for the message table, where building a model instance per row and
+    compiling it in ``bulk_create`` costs more than the inserts themselves.
+    """
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(model._meta.get_field(name).column) for name in field_names)
+    row_sql = '(' + ', '.join(['%s'] * len(field_names)) + ')'
+    max_params = connection.features.max_query_params or 65535
+    per_statement = max(1, max_params // len(field_names))
+    with connection.cursor() as cursor:
+        for chunk in _batched(rows, per_statement):
+            cursor.execute(
+                f'INSERT INTO {quote(model._meta.db_table)} ({columns}) VALUES '
+                + ', '.join([row_sql] * len(chunk)),
+                [value for row in chunk for value in row],
+            )
+
+
+def seed(users=1000, skills=3000, exchanges=5000, messages=100000, review_rate=0.7,
+         batch_size=5000, random_seed=42, prefix='seed', password='password', log=None):
+    """
+    Create the given number of rows and return a dict of counts per table.
+
+    Usernames are ``<prefix>_<n>`` and continue after any earlier seed run,
+    so seeding twice adds data instead of failing on duplicates. Every
+    seeded user shares ``password``.
+    """
+    rng = random.Random(random_seed)
+    log = log or (lambda message: None)
+    counts = {}
+
+    start = User.objects.filter(username__startswith=f'{prefix}_').count()
+    password_hash = make_password(password)
+    created_users = []
+    for batch in _batched(range(start, start + users), batch_size):
+        created_users += User.objects.bulk_create([
+            User(username=f'{prefix}_{n}', email=f'{prefix}_{n}@example.com', password=password_hash)
+            for n in batch
+        ])
+    profiles = []
+    for batch in _batched(created_users, batch_size):
+        profiles += UserProfile.objects.bulk_create([
+            UserProfile(user=user, location=rng.choice(['Berlin', 'Lagos', 'Lima', 'Pune', 'Toronto', '']))
+            for user in batch
+        ])
+    counts['users'] = len(profiles)
+    log(f'Created {len(profiles)} users')
+    if not profiles:
+        return counts
+
+    created_skills = []
+    for batch in _batched(range(skills), batch_size):
+        categories = _weighted(rng, CATEGORY_WEIGHTS, len(batch))
+        levels = _weighted(rng, LEVEL_WEIGHTS, len(batch))
+        created_skills += Skill.objects.bulk_create([
+            Skill(owner=rng.choice(profiles), name=rng.choice(SKILL_NAMES[category]),
+                  description=f'I can teach {category} at {level} level.',
+                  category=category, level=level)
+            for category, level in zip(categories, levels)
+        ])
+    counts['skills'] = len(created_skills)
+    log(f'Created {len(created_skills)} skills')
+
+    # Exchanges trade a skill of the requester for one of the provider
+    created_exchanges = []
+    # Needs skills of at least two owners; pairs within one owner are redrawn
+    if len({skill.owner_id for skill in created_skills}) > 1:
+        for batch in _batched(range(exchanges), batch_size):
+            rows = []
+            for status in _weighted(rng, STATUS_WEIGHTS, len(batch)):
+                offered, requested = rng.sample(created_skills, 2)
+                while offered.owner_id == requested.owner_id:
+                    offered, requested = rng.sample(created_skills, 2)
+                rows.append(SkillExchange(
+                    skill_offered=offered, skill_requested=requested, status=status,
+                    requester_id=offered.owner_id, provider_id=requested.owner_id,
+                ))
+            created_exchanges += SkillExchange.objects.bulk_create(rows)
+    counts['exchanges'] = len(created_exchanges)
+    log(f'Created {len(created_exchanges)} exchanges')
+
+    reviews = []
+    for exchange in created_exchanges:
+        if exchange.status != 'completed':
+            continue
+        for reviewer_id, reviewee_id in ((exchange.requester_id, exchange.provider_id),
+                                         (exchange.provider_id, exchange.requester_id)):
+            if rng.random() < review_rate:
+                reviews.append(Review(
+                    reviewer_id=reviewer_id, reviewee_id=reviewee_id, exchange=exchange,
+                    rating=_weighted(rng, RATING_WEIGHTS, 1)[0], comment='Great exchange, would swap again.',
+                ))
+    for batch in _batched(reviews, batch_size):
+        Review.objects.bulk_create(batch)
+    counts['reviews'] = len(reviews)
+    log(f'Created {len(reviews)} reviews')
+
+    # Threads between exchange partners and some strangers, ranked by a power law
+    threads = [(e.requester_id, e.provider_id, e.pk) for e in created_exchanges]
+    if len(profiles) > 1:
+        threads += [(a.pk, b.pk, None) for a, b in (rng.sample(profiles, 2) for _ in range(len(profiles)))]
+    rng.shuffle(threads)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) ** THREAD_SKEW for rank in range(len(threads))))
+    created_messages = 0
+    if threads:
+        fields = ['sender', 'receiver', 'content', 'exchange', 'is_read', 'created_at']
+        adapt = connection.ops.adapt_datetimefield_value
+        first_at = timezone.now() - timedelta(days=MESSAGE_HISTORY_DAYS)
+        step = timedelta(days=MESSAGE_HISTORY_DAYS) / max(messages, 1)
+        for batch in _batched(range(messages), batch_size):
+            rows = []
+            picks = rng.choices(threads, cum_weights=cum_weights, k=len(batch))
+            for n, (first, second, exchange_id) in zip(batch, picks):
+                sender_id, receiver_id = (first, second) if rng.random() < 0.5 else (second, first)
+                rows.append((
+                    sender_id, receiver_id, rng.choice(MESSAGE_TEXTS),
+                    exchange_id if rng.random() < 0.5 else None, rng.random() < 0.85,
+                    adapt(first_at + step * n),
+                ))
+            _insert_rows(Message, fields, rows)
+            created_messages += len(rows)
+            log(f'Created {created_messages} messages...')
+    counts['messages'] = created_messages
+
+    rebuild_derived_data(profiles, created_skills, batch_size)
+    log('Rebuilt counters, conversations and indexes')
+    return counts
+
+
+def rebuild_derived_data(profiles, skills, batch_size=5000):
+    """Bring everything the signal handlers maintain up to date after bulk inserts"""
+    recompute_counters(UserProfile.objects.filter(pk__gte=min(p.pk for p in profiles)), batch_size)
+    rebuild_conversations(batch_size)
+    rebuild_offers(batch_size)
+    for batch in _batched(skills, batch_size):
+        search.index_skills(batch)
+    for model_name in ('skill', 'userprofile', 'review'):
+        bump_generation(model_name)
+    invalidate_admin_stats()
@@ -0,0 +1,211 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_init, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from .cache import bump_generation, invalidate_admin_stats
+from .models import UserProfile, Skill, SkillExchange, ExchangeEvent, Message, Review
+from . import conversations, counters, images, realtime, recommendations, search
+
+
+# ============================================================================
+# USER PROFILES
+# ============================================================================
+
+@receiver(post_save, sender=User)
+def create_profile(sender, instance, created, raw=False, **kwargs):
+    # Every user has a profile, so requests never have to get_or_create one
+    if created and not raw:
+        UserProfile.objects.create(user=instance)
+
+
+# ============================================================================
+# SEARCH INDEX
+# ============================================================================
+
+@receiver(post_save, sender=Skill)
+def index_skill(sender, instance, **kwargs):
+    search.index_skills([instance])
+
+
+@receiver(post_delete, sender=Skill)
+def unindex_skill(sender, instance, **kwargs):
+    search.remove_skills([instance.id])
+
+
+# ============================================================================
+# SWAP RECOMMENDATION INDEX
+# ============================================================================
+
+@receiver(post_init, sender=Skill)
+def remember_skill_offer(sender, instance, **kwargs):
+    instance._saved_offer = (instance.__dict__.get('owner_id'), instance.__dict__.get('category')) if instance.pk else None
+
+
+@receiver(post_save, sender=Skill)
+def refresh_skill_offer(sender, instance, **kwargs):
+    current = (instance.owner_id, instance.category)
+    previous = instance._saved_offer
+    if previous is not None and previous != current and None not in previous:
+        recommendations.refresh_offers(previous[0], [previous[1]])
+    recommendations.refresh_offers(instance.owner_id, [instance.category])
+    instance._saved_offer = current
+
+
+@receiver(post_delete, sender=Skill)
+def remove_skill_offer(sender, instance, **kwargs):
+    recommendations.refresh_offers(instance.owner_id, [instance.category])
+
+
+# ============================================================================
+# PROFILE COUNTERS
+# ============================================================================
+
+@receiver(post_init, sender=SkillExchange)
+def remember_exchange_status(sender, instance, **kwargs):
+    # Read through __dict__ so a deferred status field is not loaded per row
+    instance._saved_status = instance.__dict__.get('status') if instance.pk else None
+
+
+@receiver(post_save, sender=SkillExchange)
+def count_exchange(sender, instance, created, **kwargs):
+    old_status = None if created else instance._saved_status
+    counters.exchange_status_changed(instance, old_status, instance.status)
+    instance._saved_status = instance.status
+
+
+@receiver(post_save, sender=ExchangeEvent)
+def count_exchange_transition(sender, instance, created, raw=False, **kwargs):
+    # Transitions change the status with a queryset UPDATE (skillswap.exchanges),
+    # which sends no SkillExchange signals; only the winning one writes an event
+    if created and not raw:
+        counters.exchange_status_changed(instance.exchange, instance.from_status, instance.to_status)
+
+
+@receiver(pre_delete, sender=SkillExchange)
+def refresh_exchange_status(sender, instance, **kwargs):
+    # The instance being deleted may be stale; count what is actually stored
+    instance._saved_status = sender.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+
+
+@receiver(post_delete, sender=SkillExchange)
+def uncount_exchange(sender, instance, **kwargs):
+    counters.exchange_status_changed(instance, instance._saved_status, None)
+
+
+@receiver(post_init, sender=Message)
+def remember_message_read(sender, instance, **kwargs):
+    # Unsaved messages have not been counted as unread yet
+    instance._saved_is_read = instance.__dict__.get('is_read', True) if instance.pk else True
+
+
+@receiver(post_save, sender=Message)
+def count_message(sender, instance, created, **kwargs):
+    if created:
+        conversations.record_message(instance)
+        realtime.publish_message(instance)
+    if instance.is_read != instance._saved_is_read:
+        if instance.is_read:
+            counters.messages_read(instance.receiver_id)
+        else:
+            counters.messages_unread(instance.receiver_id)
+        if not created:
+            conversations.adjust_unread(
+                instance.receiver_id, instance.sender_id, -1 if instance.is_read else 1
+            )
+    instance._saved_is_read = instance.is_read
+
+
+@receiver(pre_delete, sender=Message)
+def refresh_message_read(sender, instance, **kwargs):
+    instance._saved_is_read = sender.objects.filter(pk=instance.pk).values_list('is_read', flat=True).first()
+
+
+@receiver(post_delete, sender=Message)
+def uncount_message(sender, instance, **kwargs):
+    if instance._saved_is_read is False:
+        counters.messages_read(instance.receiver_id)
+        conversations.adjust_unread(instance.receiver_id, instance.sender_id, -1)
+
+
+@receiver(post_init, sender=Review)
+def remember_review(sender, instance, **kwargs):
+    instance._saved_rating = (instance.__dict__.get('reviewee_id'), instance.__dict__.get('rating')) if instance.pk else None
+
+
+@receiver(post_save, sender=Review)
+def count_review(sender, instance, created, **kwargs):
+    saved = None if created else instance._saved_rating
+    if saved is None:
+        counters.review_added(instance.reviewee_id, instance.rating)
+    elif saved[0] != instance.reviewee_id:
+        counters.review_removed(*saved)
+        counters.review_added(instance.reviewee_id, instance.rating)
+    else:
+        counters.review_changed(instance.reviewee_id, saved[1], instance.rating)
+    instance._saved_rating = (instance.reviewee_id, instance.rating)
+
+
+@receiver(pre_delete, sender=Review)
+def refresh_review(sender, instance, **kwargs):
+    instance._saved_rating = sender.objects.filter(pk=instance.pk).values_list('reviewee_id', 'rating').first()
+
+
+@receiver(post_delete, sender=Review)
+def uncount_review(sender, instance, **kwargs):
+    if instance._saved_rating is not None:
+        counters.review_removed(*instance._saved_rating)
+
+
+# ============================================================================
+# ADMIN STATISTICS
+# ============================================================================
+
+@receiver([post_save, post_delete], sender=UserProfile)
+@receiver([post_save, post_delete], sender=Skill)
+@receiver([post_save, post_delete], sender=SkillExchange)
+@receiver(post_save, sender=ExchangeEvent)
+@receiver([post_save, post_delete], sender=Message)
+@receiver([post_save, post_delete], sender=Review)
+def drop_admin_stats(sender, **kwargs):
+    invalidate_admin_stats()
+
+
+# ============================================================================
+# PAGE AND FRAGMENT CACHE GENERATIONS
+# ============================================================================
+
+@receiver([post_save, post_delete], sender=Skill)
+def bump_skill_generation(sender, **kwargs):
+    bump_generation('skill')
+
+
+@receiver([post_save, post_delete], sender=UserProfile)
+def bump_profile_generation(sender, **kwargs):
+    bump_generation('userprofile')
+
+
+@receiver([post_save, post_delete], sender=Review)
+def bump_review_generation(sender, **kwargs):
+    bump_generation('review')
+
+
+@receiver([post_save, post_delete], sender=User)
+def bump_user_generation(sender, update_fields=None, **kwargs):
+    # Names and usernames are shown on cached profile pages; logins only touch last_login
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    bump_generation('userprofile')
+
+
+# ============================================================================
+# IMAGE DERIVATIVES
+# ============================================================================
+
+@receiver(post_save, sender=UserProfile)
+def schedule_profile_picture_derivatives(sender, instance, **kwargs):
+    images.schedule(instance, 'profile_picture')
+
+
+@receiver(post_save, sender=Skill)
+def schedule_skill_image_derivatives(sender, instance, **kwargs):
+    images.schedule(instance, 'image')
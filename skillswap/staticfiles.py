@@ -0,0 +1,80 @@
+"""
+Static files served by WhiteNoise without scanning STATIC_ROOT at startup.
+
+``collectstatic`` (through ``StaticFilesStorage``) writes a listing of every
+collected file with its size and modification time. ``StaticFilesMiddleware``
+reads it instead of walking and stat()ing the directory on each cold start,
+and prepares the headers of a file when it is first requested rather than
+for all files up front. Without a listing, e.g. before the first
+``collectstatic``, it falls back to WhiteNoise's scan.
+"""
+
+import json
+import os
+import stat
+
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.storage import CompressedStaticFilesStorage
+
+LISTING_NAME = 'staticfiles-listing.json'
+
+
+def write_listing(root):
+    files = {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            relative = os.path.relpath(path, root).replace(os.sep, '/')
+            if relative != LISTING_NAME:
+                result = os.stat(path)
+                files[relative] = [result.st_size, result.st_mtime]
+    temporary = os.path.join(root, LISTING_NAME + '.tmp')
+    with open(temporary, 'w') as handle:
+        json.dump(files, handle, separators=(',', ':'))
+    os.replace(temporary, os.path.join(root, LISTING_NAME))
+
+
+def read_listing(root):
+    """``{absolute path: stat result}`` from the listing in ``root``, or None"""
+    try:
+        with open(os.path.join(root, LISTING_NAME)) as handle:
+            files = json.load(handle)
+    except FileNotFoundError:
+        return None
+    mode = stat.S_IFREG | 0o644
+    return {
+        os.path.join(root, *relative.split('/')): os.stat_result((mode, 0, 0, 1, 0, 0, size, mtime, mtime, mtime))
+        for relative, (size, mtime) in files.items()
+    }
+
+
+class StaticFilesStorage(CompressedStaticFilesStorage):
+    """WhiteNoise's compressing storage, plus the listing read at startup"""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if not dry_run:
+            write_listing(self.location)
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    def __init__(self, *args, **kwargs):
+        # url -> (path, stat cache) of every listed file; its StaticFile is
+        # added to self.files when the url is first requested
+        self.listed = {}
+        super().__init__(*args, **kwargs)
+
+    def update_files_dictionary(self, root, prefix):
+        stat_cache = read_listing(root)
+        if stat_cache is None or self.index_file is not None:
+            return super().update_files_dictionary(root, prefix)
+        for path in stat_cache:
+            if not self.is_compressed_variant(path, stat_cache=stat_cache):
+                self.listed[prefix + path[len(root):].replace('\\', '/')] = (path, stat_cache)
+
+    def __call__(self, request):
+        listed = self.listed.get(request.path_info)
+        if listed is not None and request.path_info not in self.files:
+            path, stat_cache = listed
+            self.files[request.path_info] = self.get_static_file(path, request.path_info, stat_cache=stat_cache)
+        return super().__call__(request)
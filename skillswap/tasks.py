@@ -0,0 +1,165 @@
+"""
+A small task queue stored in the application database.
+
+Functions decorated with ``@task`` can be deferred with ``fn.enqueue(...)``.
+The row is written inside the caller's transaction, so a worker only sees it
+once that transaction commits and never sees it if it rolls back. Workers
+(``manage.py run_worker``) claim due tasks under a lease: with
+``SELECT ... FOR UPDATE SKIP LOCKED`` where the database supports it
+(PostgreSQL), and otherwise with a conditional UPDATE of the lease columns
+that only one worker can win (SQLite). Failures are retried with exponential
+backoff; after ``max_attempts`` the task moves to the ``DeadTask`` table.
+
+Configured with ``SKILLSWAP_TASKS``. ``EAGER`` is the default, for setups
+without a worker: tasks run in-process right after the enqueuing transaction
+commits, once, and a failure is logged rather than retried. Turn it off only
+where ``run_worker`` runs, or the queue is never drained.
+"""
+
+import logging
+import os
+import socket
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import DeadTask, Task
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'EAGER': True,
+    'MAX_ATTEMPTS': 5,
+    'LEASE_SECONDS': 300,
+    'RETRY_BASE_DELAY': 10,
+    'RETRY_MAX_DELAY': 60 * 60,
+}
+
+_registry = {}
+
+
+def get_setting(name):
+    return getattr(settings, 'SKILLSWAP_TASKS', {}).get(name, DEFAULTS[name])
+
+
+def task(func=None, *, max_attempts=None):
+    """Register ``func`` as a task and give it an ``enqueue`` method"""
+    def register(func):
+        name = f'{func.__module__}.{func.__qualname__}'
+        _registry[name] = func
+        func.task_name = name
+        func.enqueue = lambda *args, **kwargs: enqueue(name, args, kwargs, max_attempts=max_attempts)
+        return func
+    return register(func) if func is not None else register
+
+
+def enqueue(name, args=(), kwargs=None, delay=0, max_attempts=None):
+    """Queue a call of the task registered as ``name`` with JSON-serializable arguments"""
+    if name not in _registry:
+        raise KeyError(f'Unknown task {name!r}')
+    if get_setting('EAGER'):
+        # robust: a failing task is logged instead of failing the request
+        transaction.on_commit(lambda: _registry[name](*args, **(kwargs or {})), robust=True)
+        return None
+    return Task.objects.create(
+        name=name,
+        args=list(args),
+        kwargs=kwargs or {},
+        run_at=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or get_setting('MAX_ATTEMPTS'),
+    )
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def retry_delay(attempts):
+    """Seconds to wait before the next try after ``attempts`` failures"""
+    return min(get_setting('RETRY_BASE_DELAY') * 2 ** (attempts - 1), get_setting('RETRY_MAX_DELAY'))
+
+
+def claim(worker, limit=10):
+    """Lease up to ``limit`` due tasks to ``worker`` and return them"""
+    now = timezone.now()
+    lease = {
+        'locked_by': worker,
+        'locked_until': now + timedelta(seconds=get_setting('LEASE_SECONDS')),
+        'attempts': F('attempts') + 1,
+    }
+    due = Task.objects.filter(run_at__lte=now).filter(
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now)
+    ).order_by('run_at', 'id')
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(due.select_for_update(skip_locked=True).values_list('id', flat=True)[:limit])
+            Task.objects.filter(pk__in=ids).update(**lease)
+    else:
+        # No row locks: a task belongs to whichever worker's UPDATE matched it first
+        ids = [
+            pk for pk in due.values_list('id', flat=True)[:limit]
+            if due.filter(pk=pk).update(**lease)
+        ]
+    return list(Task.objects.filter(pk__in=ids, locked_by=worker).order_by('run_at', 'id'))
+
+
+def execute(item):
+    """Run one claimed task and record the outcome; returns True on success"""
+    func = _registry.get(item.name)
+    try:
+        if func is None:
+            raise LookupError(f'Unknown task {item.name!r}')
+        # Deleting the row in the task's own transaction applies its database
+        # effects exactly once; only side effects outside the database may repeat
+        with transaction.atomic():
+            func(*item.args, **item.kwargs)
+            Task.objects.filter(pk=item.pk).delete()
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning('Task %s (%s) failed on attempt %s', item.pk, item.name, item.attempts)
+        if func is None or item.attempts >= item.max_attempts:
+            bury(item, error)
+        else:
+            Task.objects.filter(pk=item.pk, locked_by=item.locked_by).update(
+                run_at=timezone.now() + timedelta(seconds=retry_delay(item.attempts)),
+                locked_by='', locked_until=None, last_error=error,
+            )
+        return False
+    return True
+
+
+def bury(item, error):
+    with transaction.atomic():
+        DeadTask.objects.create(
+            name=item.name, args=item.args, kwargs=item.kwargs, attempts=item.attempts,
+            last_error=error, created_at=item.created_at,
+        )
+        Task.objects.filter(pk=item.pk).delete()
+
+
+def requeue(dead_tasks):
+    """Move dead tasks back onto the queue with a fresh attempt budget"""
+    with transaction.atomic():
+        Task.objects.bulk_create([
+            Task(name=dead.name, args=dead.args, kwargs=dead.kwargs,
+                 max_attempts=get_setting('MAX_ATTEMPTS'))
+            for dead in dead_tasks
+        ])
+        return DeadTask.objects.filter(pk__in=[dead.pk for dead in dead_tasks]).delete()[0]
+
+
+def run_pending(worker=None, limit=10):
+    """Claim and run one batch; returns (succeeded, failed)"""
+    worker = worker or worker_id()
+    succeeded = failed = 0
+    for item in claim(worker, limit):
+        if execute(item):
+            succeeded += 1
+        else:
+            failed += 1
+    return succeeded, failed
@@ -0,0 +1,50 @@
+from django import template
+
+from ..cache import get_fragment
+
+register = template.Library()
+
+
+class FragmentCacheNode(template.Node):
+
+    def __init__(self, nodelist, name, model_names, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.model_names = model_names
+        self.vary_on = vary_on
+
+    def render(self, context):
+        vary_on = [variable.resolve(context) for variable in self.vary_on]
+        return get_fragment(
+            self.name, self.model_names, vary_on, lambda: self.nodelist.render(context)
+        )
+
+
+@register.tag
+def fragment_cache(parser, token):
+    """
+    Cache the enclosed template output until one of the named models changes::
+
+        {% fragment_cache "profile_reviews" "review userprofile" profile.pk %}
+            ...
+        {% end_fragment_cache %}
+
+    The first argument names the fragment, the second lists the models whose
+    generation versions the key, and any further arguments are varied on.
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            f'{bits[0]} takes a fragment name, a list of models and optional vary-on values'
+        )
+    for bit in bits[1:3]:
+        if not (bit[0] == bit[-1] and bit[0] in ('"', "'")):
+            raise template.TemplateSyntaxError(f'{bits[0]} expects quoted fragment name and models')
+    nodelist = parser.parse(('end_fragment_cache',))
+    parser.delete_first_token()
+    return FragmentCacheNode(
+        nodelist,
+        bits[1][1:-1],
+        bits[2][1:-1].split(),
+        [parser.compile_filter(bit) for bit in bits[3:]],
+    )
@@ -0,0 +1,48 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+
+from ..images import SIZES, derivatives_field, is_current
+
+register = template.Library()
+
+
+def _srcset(storage, entries, kind):
+    return ', '.join(f'{storage.url(entry[kind])} {entry["width"]}w' for entry in entries)
+
+
+@register.simple_tag
+def responsive_image(fieldfile, size='card', sizes=None, **attrs):
+    """
+    Render an ``<img>`` for an image field, picking from its derivatives.
+
+    ``size`` is the derivative used as the fallback ``src`` and sets the
+    default ``sizes`` hint; the browser chooses among every width in the
+    ``srcset`` and prefers WebP where supported. Images without up-to-date
+    derivatives are rendered from the original upload::
+
+        {% responsive_image skill.image "card" alt=skill.name class="card-img-top" %}
+    """
+    if not fieldfile:
+        return ''
+    if size != 'full':
+        attrs.setdefault('loading', 'lazy')
+    derivatives = getattr(fieldfile.instance, derivatives_field(fieldfile.field.name), None)
+    if not is_current(fieldfile, derivatives) or size not in derivatives['sizes']:
+        return format_html('<img src="{}"{}>', fieldfile.url, flatatt(attrs))
+
+    storage = fieldfile.storage
+    chosen = derivatives['sizes'][size]
+    entries = []
+    for entry in sorted(derivatives['sizes'].values(), key=lambda entry: entry['width']):
+        # Small uploads produce the same width for several sizes
+        if not entries or entry['width'] > entries[-1]['width']:
+            entries.append(entry)
+    sizes = sizes or f'(max-width: {SIZES[size]}px) 100vw, {SIZES[size]}px'
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}"{}></picture>',
+        _srcset(storage, entries, 'webp'), sizes,
+        storage.url(chosen['fallback']), _srcset(storage, entries, 'fallback'), sizes,
+        chosen['width'], chosen['height'], flatatt(attrs),
+    )
@@ -0,0 +1,55 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from .archive import archive_messages
+from .models import Message
+from .seeding import seed
+
+
+class AdminChangelistQueryTests(TestCase):
+    """
+    The admin changelists load their related rows and counts in the page
+    query (see the ``get_queryset`` overrides in skillswap.admin), so the
+    number of queries per page must not grow with the number of rows.
+    """
+
+    # Changelist URL -> queries for one page
+    EXPECTED_QUERIES = {
+        '/admin/skillswap/userprofile/': 6,
+        '/admin/skillswap/skill/': 5,
+        '/admin/skillswap/skillexchange/': 5,
+        '/admin/skillswap/message/': 5,
+        '/admin/skillswap/archivedmessage/': 6,
+        '/admin/skillswap/review/': 6,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        # Admin statistics and generations are cached between requests
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def add_rows(self, users):
+        seed(users=users, skills=users * 3, exchanges=users * 4, messages=users * 20, review_rate=1)
+        # The read ones among the newest messages, so both message changelists grow
+        newest = list(Message.objects.order_by('-pk').values_list('pk', flat=True)[:users * 10])
+        archive_messages(Message.objects.filter(pk__in=newest))
+
+    def assert_changelist_queries(self):
+        for url, expected in self.EXPECTED_QUERIES.items():
+            with self.subTest(url=url):
+                cache.clear()
+                with self.assertNumQueries(expected):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+    def test_queries_do_not_grow_with_rows(self):
+        self.add_rows(5)
+        self.assert_changelist_queries()
+        # Past the 100-row page of every changelist
+        self.add_rows(40)
+        self.assert_changelist_queries()
@@ -12,6 +12,7 @@ urlpatterns = [
     
     # Dashboard & Profile
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/suggestions/', views.suggested_swaps_json, name='suggested_swaps'),
     path('profile/edit/', views.profile_edit, name='profile_edit'),
     path('profile/<str:username>/', views.profile_view, name='profile'),
     
@@ -33,5 +34,12 @@ urlpatterns = [
     # Messaging
     path('messages/', views.messages_list, name='messages_list'),
     path('chat/<str:username>/', views.chat_view, name='chat_view'),
+    path('chat/<str:username>/messages/', views.chat_messages, name='chat_messages'),
+    path('chat/<str:username>/stream/', views.chat_stream, name='chat_stream'),
     path('exchange/<int:exchange_id>/chat/', views.exchange_chat_view, name='exchange_chat'),
+    path('exchange/<int:exchange_id>/chat/messages/', views.exchange_chat_messages, name='exchange_chat_messages'),
+    path('exchange/<int:exchange_id>/chat/stream/', views.exchange_chat_stream, name='exchange_chat_stream'),
+
+    # Monitoring
+    path('metrics/', views.metrics_view, name='metrics'),
 ]
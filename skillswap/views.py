@@ -1,36 +1,67 @@
+import json
+import time
+from datetime import datetime
+
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Avg
-from .models import UserProfile, Skill, SkillExchange, Review, Message
-from .forms import (UserRegistrationForm, UserProfileForm, UserUpdateForm, 
+from django.db import connections, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.formats import date_format
+from django.utils.crypto import constant_time_compare
+from django.utils.http import urlencode
+from .models import UserProfile, Skill, SkillExchange, Review, Message, ArchivedMessage, Conversation
+from .forms import (UserProfileForm, UserUpdateForm,
                     SkillForm, SkillExchangeForm, ReviewForm, MessageForm)
-
-
+from .pagination import KeysetPaginator, InvalidCursor
+from .search import search_skills, search_terms, is_ranked as search_is_ranked
+from . import conversations, counters, exchanges, metrics, realtime
+from .broker import get_broker
+from .cache import cache_anonymous_page, cache_stats, get_admin_stats
+from .ratelimit import rate_limit
+from .recommendations import suggested_swaps
+
+BROWSE_PAGE_SIZE = 24
+INBOX_PAGE_SIZE = 30
+ADMIN_USERS_PAGE_SIZE = 25
+CHAT_WINDOW_SIZE = 50
+CHAT_FETCH_LIMIT = 100
+CHAT_STREAM_TIMEOUT = 300
+CHAT_STREAM_KEEPALIVE = 15
+
+
+@cache_anonymous_page('skill', 'userprofile', 'review')
 def index(request):
     """Home page"""
-    skills = Skill.objects.all()[:6]
-    total_users = UserProfile.objects.count()
-    total_skills = Skill.objects.count()
+    # Lazy querysets and callables: the template only evaluates them when
+    # their cached fragment has to be rendered again
+    skills = Skill.objects.select_related('owner__user')[:6]
     context = {
         'skills': skills,
-        'total_users': total_users,
-        'total_skills': total_skills,
+        'total_users': UserProfile.objects.count,
+        'total_skills': Skill.objects.count,
     }
     return render(request, 'skillswap/index.html', context)
 
 
+@rate_limit()
 def register(request):
     """User registration"""
+    # Imported here: loading the form's password validators is slow (see skillswap/registration.py)
+    from .registration import UserRegistrationForm
+
     if request.user.is_authenticated:
         return redirect('dashboard')
     
     if request.method == 'POST':
         form = UserRegistrationForm(request.POST)
         if form.is_valid():
-            user = form.save()
-            UserProfile.objects.create(user=user)
+            form.save()
             messages.success(request, 'Account created successfully! Please login.')
             return redirect('login')
         else:
@@ -43,6 +74,7 @@ def register(request):
     return render(request, 'skillswap/register.html', {'form': form})
 
 
+@rate_limit()
 def login_view(request):
     """User login"""
     if request.user.is_authenticated:
@@ -74,39 +106,47 @@ def logout_view(request):
 @login_required
 def dashboard(request):
     """User dashboard"""
-    # Get or create profile for user
-    profile, created = UserProfile.objects.get_or_create(user=request.user)
+    profile = request.profile
     
     skills = profile.skills.all()
     exchanges = SkillExchange.objects.filter(
         Q(requester=profile) | Q(provider=profile)
+    ).select_related(
+        'requester__user', 'provider__user', 'skill_offered', 'skill_requested'
     ).order_by('-created_at')
     
-    # Statistics
-    completed_exchanges = exchanges.filter(status='completed').count()
-    pending_exchanges = exchanges.filter(status='pending').count()
-    average_rating = profile.reviews_received.aggregate(Avg('rating'))['rating__avg'] or 0
+    # Statistics (denormalized counters on the profile row)
+    completed_exchanges = profile.exchanges_completed
+    pending_exchanges = profile.exchanges_pending
+    average_rating = profile.rating
     
     # Unread messages
-    unread_messages = Message.objects.filter(receiver=profile, is_read=False).count()
+    unread_messages = profile.unread_messages
     
     # Admin statistics (only for admin user)
     is_admin = request.user.is_staff and request.user.is_superuser
     admin_stats = {}
     if is_admin:
+        # Newest profiles first, one page at a time, with skill counts joined in
+        users = UserProfile.objects.select_related('user').annotate(skills_total=Count('skills'))
+        paginator = KeysetPaginator(users, per_page=ADMIN_USERS_PAGE_SIZE, key='id')
+        try:
+            users_page = paginator.page(after=request.GET.get('users_after'),
+                                        before=request.GET.get('users_before'))
+        except InvalidCursor:
+            users_page = paginator.page()
         admin_stats = {
-            'total_users': UserProfile.objects.count(),
-            'total_skills': Skill.objects.count(),
-            'total_exchanges': SkillExchange.objects.count(),
-            'pending_exchanges': SkillExchange.objects.filter(status='pending').count(),
-            'completed_exchanges': SkillExchange.objects.filter(status='completed').count(),
-            'total_messages': Message.objects.count(),
-            'unread_messages': Message.objects.filter(is_read=False).count(),
-            'total_reviews': Review.objects.count(),
-            'all_users': UserProfile.objects.all(),
-            'all_skills': Skill.objects.all()[:10],
-            'all_exchanges': SkillExchange.objects.all()[:10],
-            'all_messages': Message.objects.all()[:10],
+            **get_admin_stats(),
+            'cache_stats': cache_stats(),
+            'all_users': users_page,
+            'users_next_query': urlencode({'users_after': users_page.next_cursor}) if users_page.has_next else '',
+            'users_prev_query': urlencode({'users_before': users_page.prev_cursor}) if users_page.has_previous else '',
+            'all_exchanges': SkillExchange.objects.filter(status='pending').select_related(
+                'requester__user', 'provider__user', 'skill_offered', 'skill_requested'
+            ).order_by('-created_at')[:10],
+            'all_messages': Message.objects.select_related(
+                'sender__user', 'receiver__user'
+            ).order_by('-created_at')[:10],
         }
     
     context = {
@@ -119,16 +159,37 @@ def dashboard(request):
         'unread_messages': unread_messages,
         'is_admin': is_admin,
         'admin_stats': admin_stats,
+        'suggested_swaps': suggested_swaps(profile),
 
     }
     return render(request, 'skillswap/dashboard.html', context)
 
 
+@login_required
+def suggested_swaps_json(request):
+    """Suggested swap partners for the current user (JSON)"""
+    profile = request.profile
+    try:
+        limit = min(max(int(request.GET.get('limit', 6)), 1), 50)
+    except ValueError:
+        limit = 6
+    suggestions = [
+        {
+            'username': suggestion['profile'].user.username,
+            'profile_url': reverse('profile', args=[suggestion['profile'].user.username]),
+            'rating': suggestion['profile'].rating,
+            'they_teach': suggestion['they_teach'],
+            'i_teach': suggestion['i_teach'],
+        }
+        for suggestion in suggested_swaps(profile, limit=limit)
+    ]
+    return JsonResponse({'suggestions': suggestions})
+
+
 @login_required
 def profile_edit(request):
     """Edit user profile"""
-    # Get or create profile for user
-    profile, created = UserProfile.objects.get_or_create(user=request.user)
+    profile = request.profile
     
     if request.method == 'POST':
         user_form = UserUpdateForm(request.POST, instance=request.user)
@@ -150,19 +211,19 @@ def profile_edit(request):
     return render(request, 'skillswap/profile_edit.html', context)
 
 
+@cache_anonymous_page('userprofile', 'skill', 'review')
 def profile_view(request, username):
     """View user profile"""
-    user = get_object_or_404(UserProfile, user__username=username)
+    user = get_object_or_404(UserProfile.objects.select_related('user'), user__username=username)
     skills = user.skills.all()
-    reviews = user.reviews_received.all()
-    average_rating = reviews.aggregate(Avg('rating'))['rating__avg'] or 0
+    reviews = user.reviews_received.select_related('reviewer__user')
     
     context = {
         'profile': user,
         'skills': skills,
         'reviews': reviews,
-        'average_rating': round(average_rating, 1),
-        'total_reviews': reviews.count(),
+        'average_rating': round(user.rating, 1),
+        'total_reviews': user.rating_count,
     }
     return render(request, 'skillswap/profile.html', context)
 
@@ -170,8 +231,7 @@ def profile_view(request, username):
 @login_required
 def skill_create(request):
     """Create a new skill"""
-    # Get or create profile for user
-    profile, created = UserProfile.objects.get_or_create(user=request.user)
+    profile = request.profile
     
     if request.method == 'POST':
         form = SkillForm(request.POST, request.FILES)
@@ -190,8 +250,7 @@ def skill_create(request):
 @login_required
 def skill_edit(request, pk):
     """Edit a skill"""
-    # Get or create profile for user
-    profile, created = UserProfile.objects.get_or_create(user=request.user)
+    profile = request.profile
     skill = get_object_or_404(Skill, pk=pk, owner=profile)
     
     if request.method == 'POST':
@@ -209,8 +268,7 @@ def skill_edit(request, pk):
 @login_required
 def skill_delete(request, pk):
     """Delete a skill"""
-    # Get or create profile for user
-    profile, created = UserProfile.objects.get_or_create(user=request.user)
+    profile = request.profile
     skill = get_object_or_404(Skill, pk=pk, owner=profile)
     
     if request.method == 'POST':
@@ -221,31 +279,48 @@ def skill_delete(request, pk):
     return render(request, 'skillswap/skill_confirm_delete.html', {'skill': skill})
 
 
+@cache_anonymous_page('skill', 'userprofile', 'review')
 def skill_detail(request, pk):
     """View skill details"""
-    skill = get_object_or_404(Skill, pk=pk)
+    skill = get_object_or_404(Skill.objects.select_related('owner__user'), pk=pk)
     context = {'skill': skill}
     return render(request, 'skillswap/skill_detail.html', context)
 
 
 def browse_skills(request):
     """Browse all skills"""
-    skills = Skill.objects.all()
+    skills = Skill.objects.select_related('owner__user')
     
     # Filter by category
     category = request.GET.get('category', '')
     if category:
         skills = skills.filter(category=category)
     
-    # Search
+    # Search (full-text index, ranked by relevance)
     search = request.GET.get('search', '')
+    sort_key = 'created_at'
     if search:
-        skills = skills.filter(
-            Q(name__icontains=search) | Q(description__icontains=search)
-        )
+        skills = search_skills(skills, search)
+        # Input without word terms matches nothing and carries no rank
+        if search_is_ranked() and search_terms(search):
+            sort_key = 'search_rank'
+    
+    # Cursor pagination keeps deep pages cheap and stable under concurrent inserts
+    paginator = KeysetPaginator(skills, per_page=BROWSE_PAGE_SIZE, key=sort_key)
+    try:
+        page = paginator.page(after=request.GET.get('after'), before=request.GET.get('before'))
+    except InvalidCursor:
+        page = paginator.page()
+    
+    filters = {key: value for key, value in (('category', category), ('search', search)) if value}
+    next_query = urlencode({**filters, 'after': page.next_cursor}) if page.has_next else ''
+    prev_query = urlencode({**filters, 'before': page.prev_cursor}) if page.has_previous else ''
     
     context = {
-        'skills': skills,
+        'skills': page,
+        'page': page,
+        'next_query': next_query,
+        'prev_query': prev_query,
         'current_category': category,
         'search_query': search,
     }
@@ -255,8 +330,7 @@ def browse_skills(request):
 @login_required
 def skill_exchange_request(request, skill_id):
     """Request a skill exchange"""
-    # Get or create profile for user
-    requester_profile, created = UserProfile.objects.get_or_create(user=request.user)
+    requester_profile = request.profile
     skill = get_object_or_404(Skill, pk=skill_id)
     
     # Cannot exchange with yourself
@@ -276,7 +350,8 @@ def skill_exchange_request(request, skill_id):
             exchange.skill_requested = requester_skill
             exchange.requester = requester_profile
             exchange.provider = skill.owner
-            exchange.save()
+            with transaction.atomic():
+                exchange.save()
             messages.success(request, 'Exchange request sent successfully!')
             return redirect('dashboard')
     else:
@@ -295,8 +370,7 @@ def skill_exchange_request(request, skill_id):
 def exchange_respond(request, exchange_id):
     """Respond to exchange request"""
     exchange = get_object_or_404(SkillExchange, pk=exchange_id)
-    # Get or create profile for user
-    profile, created = UserProfile.objects.get_or_create(user=request.user)
+    profile = request.profile
     
     # Only provider can respond
     if exchange.provider != profile:
@@ -305,14 +379,15 @@ def exchange_respond(request, exchange_id):
     
     if request.method == 'POST':
         action = request.POST.get('action')
-        if action == 'accept':
-            exchange.status = 'accepted'
-            exchange.save()
-            messages.success(request, 'Exchange accepted!')
-        elif action == 'reject':
-            exchange.status = 'rejected'
-            exchange.save()
-            messages.success(request, 'Exchange rejected.')
+        if action in ('accept', 'reject'):
+            to_status, success = {
+                'accept': ('accepted', 'Exchange accepted!'),
+                'reject': ('rejected', 'Exchange rejected.'),
+            }[action]
+            if exchanges.transition(exchange, to_status, actor=profile):
+                messages.success(request, success)
+            else:
+                messages.error(request, f'This exchange is already {exchange.get_status_display().lower()}.')
         
         return redirect('dashboard')
     
@@ -323,20 +398,19 @@ def exchange_respond(request, exchange_id):
 def exchange_complete(request, exchange_id):
     """Mark exchange as completed"""
     exchange = get_object_or_404(SkillExchange, pk=exchange_id)
-    # Get or create profile for user
-    profile, created = UserProfile.objects.get_or_create(user=request.user)
+    profile = request.profile
     
     # Either requester or provider can complete
     if exchange.requester != profile and exchange.provider != profile:
         messages.error(request, 'You are not part of this exchange.')
         return redirect('dashboard')
     
-    if exchange.status != 'accepted':
+    if not exchanges.transition(exchange, 'completed', actor=profile):
+        if exchange.status == 'completed':
+            messages.info(request, 'Exchange already completed.')
+            return redirect('create_review', exchange_id=exchange.id)
         messages.error(request, 'Exchange must be accepted first.')
         return redirect('dashboard')
-    
-    exchange.status = 'completed'
-    exchange.save()
     messages.success(request, 'Exchange completed!')
     
     # Redirect to review page
@@ -347,8 +421,7 @@ def exchange_complete(request, exchange_id):
 def create_review(request, exchange_id):
     """Create a review for completed exchange"""
     exchange = get_object_or_404(SkillExchange, pk=exchange_id)
-    # Get or create profile for user
-    profile, created = UserProfile.objects.get_or_create(user=request.user)
+    profile = request.profile
     
     # Determine reviewee
     if exchange.requester == profile:
@@ -366,12 +439,9 @@ def create_review(request, exchange_id):
             review.reviewer = profile
             review.reviewee = reviewee
             review.exchange = exchange
-            review.save()
-            
-            # Update reviewer rating
-            avg_rating = reviewee.reviews_received.aggregate(Avg('rating'))['rating__avg']
-            reviewee.rating = avg_rating
-            reviewee.save()
+            # The review signal updates the reviewee's rating in O(1) in this transaction
+            with transaction.atomic():
+                review.save()
             
             messages.success(request, 'Review submitted successfully!')
             return redirect('profile', username=reviewee.user.username)
@@ -399,96 +469,263 @@ def create_review(request, exchange_id):
 @login_required
 def messages_list(request):
     """View all conversations"""
-    # Get or create profile for user
-    profile, created = UserProfile.objects.get_or_create(user=request.user)
-    
-    # Get all conversations (people who messaged or were messaged)
-    sent_messages = Message.objects.filter(sender=profile).values('receiver').distinct()
-    received_messages = Message.objects.filter(receiver=profile).values('sender').distinct()
+    profile = request.profile
     
-    senders = UserProfile.objects.filter(id__in=[m['receiver'] for m in sent_messages])
-    receivers = UserProfile.objects.filter(id__in=[m['sender'] for m in received_messages])
-    
-    conversations = list(senders) + list(receivers)
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_conversations = []
-    for conv in conversations:
-        if conv.id not in seen:
-            seen.add(conv.id)
-            unique_conversations.append(conv)
+    # One row per conversation partner, newest activity first
+    conversations = Conversation.objects.filter(owner=profile).select_related('partner__user')
+    paginator = KeysetPaginator(conversations, per_page=INBOX_PAGE_SIZE, key='last_message_at')
+    try:
+        page = paginator.page(after=request.GET.get('after'), before=request.GET.get('before'))
+    except InvalidCursor:
+        page = paginator.page()
     
     context = {
-        'conversations': unique_conversations,
+        'conversations': page,
+        'page': page,
+        'next_query': urlencode({'after': page.next_cursor}) if page.has_next else '',
+        'prev_query': urlencode({'before': page.prev_cursor}) if page.has_previous else '',
     }
     return render(request, 'skillswap/messages_list.html', context)
 
 
+def _conversation_messages(profile, other_user, model=Message):
+    """All messages exchanged between two profiles, in the hot table or ``model``"""
+    return model.objects.filter(
+        Q(sender=profile, receiver=other_user) |
+        Q(sender=other_user, receiver=profile)
+    )
+
+
+def _exchange_other_user(exchange, profile):
+    """The other participant of an exchange, or None if profile is not part of it"""
+    if exchange.requester_id == profile.id:
+        return exchange.provider
+    if exchange.provider_id == profile.id:
+        return exchange.requester
+    return None
+
+
+def _message_window(queryset, before=None, limit=CHAT_WINDOW_SIZE):
+    """The ``limit`` newest messages (older than ``before``), oldest first"""
+    queryset = queryset.order_by('-id')
+    if before:
+        queryset = queryset.filter(id__lt=before)
+    rows = list(queryset[:limit + 1])
+    return rows[:limit][::-1], len(rows) > limit
+
+
+def _conversation_window(profile, other_user, before=None, limit=CHAT_WINDOW_SIZE):
+    """
+    ``_message_window`` over the hot and archived messages together. Unread
+    messages stay hot while older read ones are archived, so the two tables
+    interleave by id and are merged rather than read one after the other.
+    """
+    rows = []
+    for model in (Message, ArchivedMessage):
+        newest, _ = _message_window(_conversation_messages(profile, other_user, model), before, limit + 1)
+        rows.extend(newest)
+    rows.sort(key=lambda m: m.id)
+    return rows[-limit:], len(rows) > limit
+
+
+def _mark_read(profile, other_user, ids):
+    """Mark the given messages to ``profile`` read and update the counters"""
+    with transaction.atomic():
+        read_count = Message.objects.filter(id__in=ids, receiver=profile, is_read=False).update(is_read=True)
+        if read_count:
+            counters.messages_read(profile.id, read_count)
+            conversations.adjust_unread(profile.id, other_user.id, -read_count)
+
+
+def _mark_delivered_read(profile, other_user, delivered):
+    """Mark only the messages actually shown to ``profile`` as read"""
+    ids = [m.id for m in delivered if m.receiver_id == profile.id and not m.is_read]
+    if not ids:
+        return
+    _mark_read(profile, other_user, ids)
+    for m in delivered:
+        if m.id in ids:
+            m.is_read = True
+
+
+def _serialize_payload(payload, profile):
+    created_at = datetime.fromisoformat(payload['created_at'])
+    return {
+        'id': payload['id'],
+        'content': payload['content'],
+        'created_at': payload['created_at'],
+        'time': date_format(timezone.localtime(created_at), 'H:i'),
+        'is_mine': payload['sender_id'] == profile.id,
+    }
+
+
+def _serialize_message(message, profile):
+    return _serialize_payload(realtime.message_payload(message), profile)
+
+
+def _chat_messages_response(request, profile, other_user):
+    """JSON page of messages newer than ``after`` or older than ``before``"""
+    try:
+        after = int(request.GET.get('after') or 0)
+        before = int(request.GET.get('before') or 0)
+    except ValueError:
+        return JsonResponse({'error': 'after and before must be message ids'}, status=400)
+    
+    if after:
+        # Newer messages are always hot
+        queryset = _conversation_messages(profile, other_user)
+        rows = list(queryset.filter(id__gt=after).order_by('id')[:CHAT_FETCH_LIMIT + 1])
+        has_more = len(rows) > CHAT_FETCH_LIMIT
+        rows = rows[:CHAT_FETCH_LIMIT]
+    else:
+        rows, has_more = _conversation_window(profile, other_user, before=before, limit=CHAT_FETCH_LIMIT)
+    
+    _mark_delivered_read(profile, other_user, rows)
+    return JsonResponse({
+        'messages': [_serialize_message(m, profile) for m in rows],
+        'has_more': has_more,
+    })
+
+
+def _sse_event(data):
+    return f"id: {data['id']}\nevent: message\ndata: {json.dumps(data)}\n\n"
+
+
+def _chat_event_stream(profile, other_user, last_event_id):
+    """
+    Server-sent events for one conversation.
+
+    Waits on a broker subscription, so an idle client costs a blocked thread
+    but no queries, and holds no database connection: connections are closed
+    before every wait and reopened only to mark a delivered message read.
+    Messages missed while disconnected are backfilled once from the database
+    using the client's Last-Event-ID.
+    """
+    subscription = get_broker().subscribe(realtime.conversation_channel(profile.id, other_user.id))
+    try:
+        yield 'retry: 3000\n\n'
+        sent_id = last_event_id
+        if last_event_id:
+            missed = list(
+                _conversation_messages(profile, other_user)
+                .filter(id__gt=last_event_id).order_by('id')[:CHAT_FETCH_LIMIT]
+            )
+            _mark_delivered_read(profile, other_user, missed)
+            for message in missed:
+                yield _sse_event(_serialize_message(message, profile))
+                sent_id = message.id
+        
+        deadline = time.monotonic() + CHAT_STREAM_TIMEOUT
+        while time.monotonic() < deadline:
+            connections.close_all()
+            payload = subscription.get(timeout=CHAT_STREAM_KEEPALIVE)
+            if payload is None:
+                if subscription.closed:
+                    break
+                yield ': keepalive\n\n'
+                continue
+            if payload['id'] <= sent_id:
+                continue
+            if payload['receiver_id'] == profile.id:
+                _mark_read(profile, other_user, [payload['id']])
+            yield _sse_event(_serialize_payload(payload, profile))
+            sent_id = payload['id']
+    finally:
+        subscription.close()
+
+
+def _chat_stream_response(request, profile, other_user):
+    try:
+        last_event_id = int(request.headers.get('Last-Event-ID') or request.GET.get('after') or 0)
+    except ValueError:
+        last_event_id = 0
+    response = StreamingHttpResponse(
+        _chat_event_stream(profile, other_user, last_event_id),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _chat_context(profile, other_user, form):
+    """Context for chat.html showing only the most recent window of messages"""
+    conversation, has_older = _conversation_window(profile, other_user)
+    _mark_delivered_read(profile, other_user, conversation)
+    return {
+        'profile': profile,
+        'other_user': other_user,
+        'conversation': conversation,
+        'has_older': has_older,
+        'first_message_id': conversation[0].id if conversation else None,
+        'last_message_id': conversation[-1].id if conversation else None,
+        'form': form,
+    }
+
+
 @login_required
+@rate_limit()
 def chat_view(request, username):
     """View chat with specific user"""
-    # Get or create profile for user
-    profile, created = UserProfile.objects.get_or_create(user=request.user)
-    other_user = get_object_or_404(UserProfile, user__username=username)
+    profile = request.profile
+    other_user = get_object_or_404(UserProfile.objects.select_related('user'), user__username=username)
     
     # Prevent chat with self
     if other_user == profile:
         messages.error(request, 'You cannot message yourself.')
         return redirect('messages_list')
     
-    # Get all messages between these two users
-    conversation = Message.objects.filter(
-        Q(sender=profile, receiver=other_user) |
-        Q(sender=other_user, receiver=profile)
-    ).order_by('created_at')
-    
-    # Mark received messages as read
-    Message.objects.filter(sender=other_user, receiver=profile, is_read=False).update(is_read=True)
-    
     if request.method == 'POST':
         form = MessageForm(request.POST)
         if form.is_valid():
             message = form.save(commit=False)
             message.sender = profile
             message.receiver = other_user
-            message.save()
+            with transaction.atomic():
+                message.save()
             return redirect('chat_view', username=username)
     else:
         form = MessageForm()
     
-    context = {
-        'other_user': other_user,
-        'conversation': conversation,
-        'form': form,
-    }
+    context = _chat_context(profile, other_user, form)
+    context['messages_url'] = reverse('chat_messages', args=[username])
+    context['stream_url'] = reverse('chat_stream', args=[username]) if settings.SKILLSWAP_CHAT_STREAMING else ''
     return render(request, 'skillswap/chat.html', context)
 
 
 @login_required
+def chat_messages(request, username):
+    """Incremental chat fetch (JSON) for polling and scrolling back"""
+    profile = request.profile
+    other_user = get_object_or_404(UserProfile, user__username=username)
+    if other_user == profile:
+        return JsonResponse({'error': 'You cannot message yourself.'}, status=400)
+    return _chat_messages_response(request, profile, other_user)
+
+
+@login_required
+def chat_stream(request, username):
+    """Live chat updates as server-sent events"""
+    profile = request.profile
+    other_user = get_object_or_404(UserProfile, user__username=username)
+    if other_user == profile:
+        return JsonResponse({'error': 'You cannot message yourself.'}, status=400)
+    return _chat_stream_response(request, profile, other_user)
+
+
+@login_required
+@rate_limit()
 def exchange_chat_view(request, exchange_id):
     """Chat for specific exchange"""
     exchange = get_object_or_404(SkillExchange, pk=exchange_id)
-    # Get or create profile for user
-    profile, created = UserProfile.objects.get_or_create(user=request.user)
+    profile = request.profile
     
     # Determine the other user
-    if exchange.requester == profile:
-        other_user = exchange.provider
-    elif exchange.provider == profile:
-        other_user = exchange.requester
-    else:
+    other_user = _exchange_other_user(exchange, profile)
+    if other_user is None:
         messages.error(request, 'You are not part of this exchange.')
         return redirect('dashboard')
     
-    # Get all messages between these two users
-    conversation = Message.objects.filter(
-        Q(sender=profile, receiver=other_user) |
-        Q(sender=other_user, receiver=profile)
-    ).order_by('created_at')
-    
-    # Mark received messages as read
-    Message.objects.filter(sender=other_user, receiver=profile, is_read=False).update(is_read=True)
-    
     if request.method == 'POST':
         form = MessageForm(request.POST)
         if form.is_valid():
@@ -496,23 +733,52 @@ def exchange_chat_view(request, exchange_id):
             message.sender = profile
             message.receiver = other_user
             message.exchange = exchange
-            message.save()
+            with transaction.atomic():
+                message.save()
             return redirect('exchange_chat', exchange_id=exchange_id)
     else:
         form = MessageForm()
     
-    context = {
-        'other_user': other_user,
-        'conversation': conversation,
-        'form': form,
-        'exchange': exchange,
-    }
+    context = _chat_context(profile, other_user, form)
+    context['exchange'] = exchange
+    context['messages_url'] = reverse('exchange_chat_messages', args=[exchange_id])
+    context['stream_url'] = reverse('exchange_chat_stream', args=[exchange_id]) if settings.SKILLSWAP_CHAT_STREAMING else ''
     return render(request, 'skillswap/chat.html', context)
 
 
 @login_required
-def unread_messages_count(request):
-    """Get count of unread messages (for header badge)"""
-    profile = request.user.userprofile
-    count = Message.objects.filter(receiver=profile, is_read=False).count()
-    return {'unread_count': count}
+def exchange_chat_messages(request, exchange_id):
+    """Incremental fetch (JSON) for an exchange chat"""
+    exchange = get_object_or_404(SkillExchange, pk=exchange_id)
+    profile = request.profile
+    other_user = _exchange_other_user(exchange, profile)
+    if other_user is None:
+        return JsonResponse({'error': 'You are not part of this exchange.'}, status=403)
+    return _chat_messages_response(request, profile, other_user)
+
+
+@login_required
+def exchange_chat_stream(request, exchange_id):
+    """Live updates (server-sent events) for an exchange chat"""
+    exchange = get_object_or_404(SkillExchange, pk=exchange_id)
+    profile = request.profile
+    other_user = _exchange_other_user(exchange, profile)
+    if other_user is None:
+        return JsonResponse({'error': 'You are not part of this exchange.'}, status=403)
+    return _chat_stream_response(request, profile, other_user)
+
+
+def metrics_view(request):
+    """Per-view request metrics in Prometheus text format (staff or bearer token only)"""
+    token = metrics.get_setting('TOKEN')
+    authorization = request.headers.get('Authorization', '')
+    if not (request.user.is_staff or (token and constant_time_compare(authorization, f'Bearer {token}'))):
+        return HttpResponseForbidden()
+    stats = cache_stats()
+    extra = [
+        ('skillswap_cache_hits_total', 'counter', 'Page and fragment cache hits',
+         [({'kind': kind}, values['hits']) for kind, values in stats.items()]),
+        ('skillswap_cache_misses_total', 'counter', 'Page and fragment cache misses',
+         [({'kind': kind}, values['misses']) for kind, values in stats.items()]),
+    ]
+    return HttpResponse(metrics.render(extra), content_type='text/plain; version=0.0.4; charset=utf-8')